@@ -0,0 +1,100 @@
+"""
+Benchmarks on the index advisor's representative filter set; the median of --repeat runs
+is reported.
+
+--compare connection (default): the app's tuned read-only SQLite connections
+(query/connection.py) against default sqlite3 connections. Each filter combination runs
+its first page (search_build) and its full count (count_build) on both connections. Run
+the default connection first so both see the same OS page cache after the warm-up run.
+
+--compare meta: the whole result set of each combination (export_build, no LIMIT) read
+with the meta_{ref} join against the sex/phenotype columns denormalized into the call
+table (helper/to_sqlite denormalize_meta), on the tuned connection.
+
+Run from the repo root:  python -m helper.benchmark --db /path/CLDB_SR.sqlite --table P2_hg19
+"""
+import time
+import argparse
+import statistics
+import sqlite3 as sq
+from query.search_filters import search_build, count_build, export_build, default_qry_dict
+from query.backend import bind_list_params
+from query.connection import connect_read_only
+from helper.index_advisor import representative_queries
+
+
+def time_query(conn, qry, params, repeat):
+    params = bind_list_params(conn, params)
+    conn.execute(qry, params).fetchall()  # warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(qry, params).fetchall()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(rows)
+
+
+def run_benchmark(db_path: str, table_name: str, repeat: int, num_rows: int):
+    connections = {
+        'default': sq.connect(db_path),
+        'tuned': connect_read_only(db_path),
+    }
+    print(f"{'query':<24}{'default (s)':>12}{'tuned (s)':>12}{'speedup':>9}")
+    for name, overrides in representative_queries(connections['default'], table_name).items():
+        for build, suffix in ((search_build, 'page'), (count_build, 'count')):
+            qry_dict = default_qry_dict(num_rows)
+            qry_dict.update(overrides)
+            qry, params = build(qry_dict, table_name)
+            try:
+                times = {label: time_query(conn, qry, dict(params), repeat)[0] for label, conn in connections.items()}
+            except sq.OperationalError as e:
+                print(f'{name} {suffix}: skipped ({e})')
+                continue
+            speedup = times['default'] / times['tuned'] if times['tuned'] else float('nan')
+            print(f"{name + ' ' + suffix:<24}{times['default']:>12.4f}{times['tuned']:>12.4f}{speedup:>8.2f}x")
+    for conn in connections.values():
+        conn.close()
+
+
+def run_meta_benchmark(db_path: str, table_name: str, repeat: int):
+    conn = connect_read_only(db_path)
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table_name})')}
+    if not {'sex', 'phenotype'} <= columns:
+        print(f'{table_name} has no sex/phenotype columns: load it with denormalize_meta: true first')
+        conn.close()
+        return
+    queries = {'all': {}, **representative_queries(conn, table_name)}
+    print(f"{'query':<24}{'rows':>10}{'join (s)':>12}{'denorm (s)':>12}{'speedup':>9}")
+    for name, overrides in queries.items():
+        times = {}
+        try:
+            for meta_join in (True, False):
+                qry_dict = default_qry_dict()
+                qry_dict.update(overrides, meta_join=meta_join)
+                qry, params = export_build(qry_dict, table_name)
+                times[meta_join], rows = time_query(conn, qry, params, repeat)
+        except sq.OperationalError as e:
+            print(f'{name}: skipped ({e})')
+            continue
+        speedup = times[True] / times[False] if times[False] else float('nan')
+        print(f"{name:<24}{rows:>10}{times[True]:>12.4f}{times[False]:>12.4f}{speedup:>8.2f}x")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare default and tuned SQLite connections, '
+                                                 'or joined and denormalized sample metadata.')
+    parser.add_argument('--db', required=True, help='SQLite file loaded by helper/to_sqlite')
+    parser.add_argument('--table', required=True, help='call table, e.g. P2_hg19')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--num_rows', type=int, default=1000)
+    parser.add_argument('--compare', choices=['connection', 'meta'], default='connection')
+    args = parser.parse_args()
+    if args.compare == 'meta':
+        run_meta_benchmark(args.db, args.table, args.repeat)
+    else:
+        run_benchmark(args.db, args.table, args.repeat, args.num_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+UCSC-style hierarchical binning for genomic intervals.
+
+Every call is assigned the smallest bin that fully contains it, so a region
+lookup only has to probe the handful of bin ranges that can overlap the region
+(one range per level) instead of scanning a whole chromosome.
+Bins cover 128kb, 1Mb, 8Mb, 64Mb and 512Mb, enough for any human chromosome.
+"""
+import numpy as np
+
+BIN_OFFSETS = [512 + 64 + 8 + 1, 64 + 8 + 1, 8 + 1, 1, 0]
+BIN_FIRST_SHIFT = 17
+BIN_NEXT_SHIFT = 3
+
+
+def reg2bin(start: int, end: int) -> int:
+    """Smallest bin containing the half-open interval [start, end)."""
+    start_bin = start >> BIN_FIRST_SHIFT
+    end_bin = (end - 1) >> BIN_FIRST_SHIFT
+    for offset in BIN_OFFSETS:
+        if start_bin == end_bin:
+            return offset + start_bin
+        start_bin >>= BIN_NEXT_SHIFT
+        end_bin >>= BIN_NEXT_SHIFT
+    raise ValueError(f'interval {start}-{end} out of binning range')
+
+
+def reg2bins(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Vectorized reg2bin over arrays of half-open intervals."""
+    start_bin = np.asarray(start, dtype=np.int64) >> BIN_FIRST_SHIFT
+    end_bin = (np.asarray(end, dtype=np.int64) - 1) >> BIN_FIRST_SHIFT
+    bins = np.full(start_bin.shape, -1, dtype=np.int64)
+    for offset in BIN_OFFSETS:
+        hit = (bins < 0) & (start_bin == end_bin)
+        bins[hit] = offset + start_bin[hit]
+        start_bin = start_bin >> BIN_NEXT_SHIFT
+        end_bin = end_bin >> BIN_NEXT_SHIFT
+    return bins
+
+
+def overlapping_bin_ranges(start: int, end: int) -> list[tuple[int, int]]:
+    """Inclusive (lo, hi) bin ranges, one per level, that can hold calls overlapping [start, end)."""
+    start_bin = start >> BIN_FIRST_SHIFT
+    end_bin = (end - 1) >> BIN_FIRST_SHIFT
+    ranges = []
+    for offset in BIN_OFFSETS:
+        ranges.append((offset + start_bin, offset + end_bin))
+        start_bin >>= BIN_NEXT_SHIFT
+        end_bin >>= BIN_NEXT_SHIFT
+    return ranges
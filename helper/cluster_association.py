@@ -0,0 +1,107 @@
+"""
+Proband enrichment of every cluster, written into clusters_{table} by helper/to_sqlite.
+
+Each cluster's proband_only_count / nonproband_only_count (from the *_cluster.py scripts)
+is tested against the proband / non-proband sample totals of the call table, all clusters
+at once on NumPy arrays:
+    fisher     one-sided Fisher's exact test (hypergeometric upper tail)
+    binomial   carriers that are probands ~ Binomial(carriers, probands / samples)
+Columns added: assoc_pvalue (indexed), assoc_qvalue (Benjamini-Hochberg over all clusters)
+and assoc_odds_ratio (0.5 added to every cell).
+"""
+import time
+import numpy as np
+import pandas as pd
+import sqlite3 as sq
+from scipy import stats
+
+ASSOCIATION_TESTS = ('fisher', 'binomial')
+ASSOCIATION_COLUMNS = ['assoc_pvalue', 'assoc_qvalue', 'assoc_odds_ratio']
+
+
+def enrichment_pvalues(proband, nonproband, n_proband, n_nonproband, test='fisher'):
+    """One-sided p-values that carriers are enriched for probands, one per cluster."""
+    # most clusters share a few small (proband, nonproband) pairs; test each pair once
+    pairs, inverse = np.unique(np.stack([proband, nonproband]), axis=1, return_inverse=True)
+    k, carriers = pairs[0], pairs[0] + pairs[1]
+    if test == 'fisher':
+        pvalues = stats.hypergeom.sf(k - 1, n_proband + n_nonproband, n_proband, carriers)
+    elif test == 'binomial':
+        pvalues = stats.binom.sf(k - 1, carriers, n_proband / (n_proband + n_nonproband))
+    else:
+        raise ValueError(f'unknown association test {test!r}; expected one of {ASSOCIATION_TESTS}')
+    return pvalues[inverse.ravel()]
+
+
+def bh_qvalues(pvalues):
+    """Benjamini-Hochberg adjusted p-values, in the input order."""
+    n = len(pvalues)
+    if n == 0:
+        return pvalues
+    order = np.argsort(pvalues)
+    ranked = pvalues[order] * n / np.arange(1, n + 1)
+    q = np.minimum.accumulate(ranked[::-1])[::-1].clip(max=1)
+    out = np.empty(n)
+    out[order] = q
+    return out
+
+
+def odds_ratios(proband, nonproband, n_proband, n_nonproband):
+    return ((proband + 0.5) * (n_nonproband - nonproband + 0.5)) / \
+        ((n_proband - proband + 0.5) * (nonproband + 0.5))
+
+
+def association_table(clusters: pd.DataFrame, n_proband: int, n_nonproband: int, test: str = 'fisher') -> pd.DataFrame:
+    """CLUSTER_ID and the ASSOCIATION_COLUMNS for a frame of cluster counts."""
+    # counts above the sample totals (stale totals, noise) would leave the tables undefined
+    proband = clusters['proband_only_count'].fillna(0).to_numpy(dtype=np.int64).clip(0, n_proband)
+    nonproband = clusters['nonproband_only_count'].fillna(0).to_numpy(dtype=np.int64).clip(0, n_nonproband)
+    pvalues = enrichment_pvalues(proband, nonproband, n_proband, n_nonproband, test)
+    return pd.DataFrame({
+        'CLUSTER_ID': clusters['CLUSTER_ID'].to_numpy(),
+        'assoc_pvalue': pvalues,
+        'assoc_qvalue': bh_qvalues(pvalues),
+        'assoc_odds_ratio': odds_ratios(proband, nonproband, n_proband, n_nonproband),
+    })
+
+
+def write_cluster_association(engine_url: str, table_name: str, test: str = 'fisher'):
+    """Add the ASSOCIATION_COLUMNS to clusters_{table_name}, sample totals taken from the call table."""
+    if test not in ASSOCIATION_TESTS:
+        raise ValueError(f'unknown association test {test!r}; expected one of {ASSOCIATION_TESTS}')
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cluster_table = f'clusters_{table_name}'
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({cluster_table})')}
+    if not {'proband_only_count', 'nonproband_only_count'} <= columns:
+        print(f'{cluster_table} has no proband/nonproband counts; skipping the association test')
+        conn.close()
+        return
+    totals = dict(conn.execute(
+        f'SELECT IS_PROBAND, COUNT(DISTINCT PT_ID) FROM {table_name} GROUP BY IS_PROBAND').fetchall())
+    n_proband, n_nonproband = int(totals.get(1, 0)), int(totals.get(0, 0))
+    if n_proband == 0 or n_nonproband == 0:
+        print(f'{table_name} needs both probands and non-probands; skipping the association test')
+        conn.close()
+        return
+
+    start = time.perf_counter()
+    clusters = pd.read_sql(
+        f'SELECT CLUSTER_ID, proband_only_count, nonproband_only_count FROM {cluster_table}', conn)
+    assoc = association_table(clusters, n_proband, n_nonproband, test)
+    print(f'{test} test on {len(assoc.index)} clusters ({n_proband} probands, {n_nonproband} non-probands) '
+          f'in {time.perf_counter() - start:.2f}s')
+
+    for col in ASSOCIATION_COLUMNS:
+        if col not in columns:
+            conn.execute(f'ALTER TABLE {cluster_table} ADD COLUMN {col} REAL')
+    assoc.to_sql('assoc_tmp', conn, if_exists='replace', index=False)
+    conn.execute('CREATE UNIQUE INDEX assoc_tmp_index ON assoc_tmp (CLUSTER_ID)')
+    conn.execute(
+        f"UPDATE {cluster_table} SET {', '.join(f'{col} = a.{col}' for col in ASSOCIATION_COLUMNS)} "
+        f'FROM assoc_tmp a WHERE a.CLUSTER_ID = {cluster_table}.CLUSTER_ID'
+    )
+    conn.execute('DROP TABLE assoc_tmp')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {cluster_table}_assoc_pvalue_index ON {cluster_table} (assoc_pvalue)')
+    conn.commit()
+    conn.close()
@@ -0,0 +1,74 @@
+"""
+Precompute the HPO ancestor/descendant closure so a term search can include
+genes annotated to any of its descendant terms with one indexed join.
+
+Writes two tables next to the call tables of a database:
+    hpo_closure (ancestor, descendant)  -- every term is its own ancestor;
+                                           alt_ids resolve to their primary term
+    hpo_genes   (hpo_id, gene_symbol)   -- from phenotype_to_genes.txt
+"""
+import pandas as pd
+import sqlite3 as sq
+from sqlalchemy import create_engine
+
+
+def parse_obo(obo_file: str):
+    """is_a parents of every non-obsolete term, and alt_id -> primary id aliases."""
+    parents, aliases = {}, {}
+    with open(obo_file, 'r') as f:
+        stanzas = f.read().split('\n[')
+    for stanza in stanzas:
+        if not stanza.startswith('Term]'):
+            continue
+        tags = [line.split(': ', 1) for line in stanza.splitlines()[1:] if ': ' in line]
+        if any(k == 'is_obsolete' and v.strip() == 'true' for k, v in tags):
+            continue
+        term_id = next(v.strip() for k, v in tags if k == 'id')
+        parents[term_id] = [v.split(' ! ')[0].strip() for k, v in tags if k == 'is_a']
+        for k, v in tags:
+            if k == 'alt_id':
+                aliases[v.strip()] = term_id
+    return parents, aliases
+
+
+def build_closure(parents: dict, aliases: dict) -> pd.DataFrame:
+    ancestors = {}
+
+    def visit(term):
+        if term not in ancestors:
+            result = {term}
+            for parent in parents.get(term, []):
+                result |= visit(parent)
+            ancestors[term] = result
+        return ancestors[term]
+
+    rows = [(anc, term) for term in parents for anc in visit(term)]
+    closure = pd.DataFrame(rows, columns=['ancestor', 'descendant'])
+
+    # searching an alt_id behaves like searching its primary term
+    alias_df = pd.DataFrame(list(aliases.items()), columns=['alt_id', 'ancestor'])
+    alias_rows = alias_df.merge(closure, on='ancestor')[['alt_id', 'descendant']]
+    alias_rows = alias_rows.rename(columns={'alt_id': 'ancestor'})
+    return pd.concat([closure, alias_rows], ignore_index=True).drop_duplicates()
+
+
+def write_hpo_to_DB(engine_url: str, obo_file: str, genes_file: str):
+    parents, aliases = parse_obo(obo_file)
+    closure = build_closure(parents, aliases)
+    print(f'{len(parents)} HPO terms, {len(closure)} closure rows')
+
+    genes = pd.read_csv(genes_file, sep='\t', usecols=['hpo_id', 'gene_symbol'])
+    genes['gene_symbol'] = genes['gene_symbol'].str.strip().str.upper()
+    genes = genes.drop_duplicates()
+
+    engine = create_engine(engine_url)
+    closure.to_sql('hpo_closure', con=engine, if_exists='replace', index=False)
+    genes.to_sql('hpo_genes', con=engine, if_exists='replace', index=False)
+
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('CREATE INDEX IF NOT EXISTS hpo_closure_index ON hpo_closure (ancestor, descendant)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS hpo_genes_index ON hpo_genes (hpo_id, gene_symbol)')
+    conn.commit()
+    conn.close()
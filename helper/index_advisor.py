@@ -0,0 +1,209 @@
+"""
+Query-plan-driven index advisor for the call tables.
+
+Replays a representative set of search_build queries against a loaded database,
+runs EXPLAIN QUERY PLAN on each and reports full scans of the call table and
+temporary B-trees. For each flagged query a composite index is proposed from its
+predicates (equality columns first, then the first range column, or the ORDER BY
+columns when the problem is a sort), built, and kept only if the re-planned query
+uses it. Kept indexes are saved to {config}.advised.yaml (e.g. sqlite_config.advised.yaml),
+which helper/to_sqlite merges into each table job's composite_indices, so the next
+reload builds them directly and the hand-maintained config is never rewritten.
+
+Run from the repo root:  python -m helper.to_sqlite --advise
+"""
+import os
+import re
+import yaml
+import sqlite3 as sq
+from query.search_filters import search_build, default_qry_dict
+from query.backend import bind_list_params
+from helper.to_sqlite import composite_index_name, advised_config_path
+
+
+def sample_value(conn, table_name: str, column: str):
+    try:
+        row = conn.execute(f'SELECT {column} FROM {table_name} WHERE {column} IS NOT NULL LIMIT 1').fetchone()
+    except sq.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def representative_queries(conn, table_name: str) -> dict[str, dict]:
+    """Typical filter combinations from the Query page, filled with values present in the table."""
+    chrom1 = sample_value(conn, table_name, 'chrom1')
+    svtype = sample_value(conn, table_name, 'SV_TYPE')
+    pt_id = sample_value(conn, table_name, 'PT_ID')
+    cluster_id = sample_value(conn, table_name, 'CLUSTER_ID')
+    return {
+        'region': {'chrom1': chrom1, 'start': 1_000_000, 'end': 5_000_000},
+        'region_svtype': {'chrom1': chrom1, 'start': 1_000_000, 'end': 5_000_000, 'svtype': [svtype]},
+        'region_overlap': {'chrom1': chrom1, 'start': 1_000_000, 'end': 5_000_000,
+                           'region_mode': 'Overlap', 'min_ro': 0.5},
+        'breakpoint': {'chrom1': chrom1, 'start': 1_000_000, 'region_mode': 'Breakpoint', 'bkpt_window': 2000},
+        'chrom_svtype': {'chrom1': chrom1, 'svtype': [svtype]},
+        'rare': {'db_freq': (0.0, 0.01)},
+        'rare_svtype': {'db_freq': (0.0, 0.01), 'svtype': [svtype]},
+        'rare_proband': {'is_proband': 'True', 'db_freq_proband': (0.0, 0.01)},
+        'rare_nonproband': {'db_freq_nonproband': (0.0, 0.01)},
+        'gnomad_rare': {'gnomAD_freq': (0.0, 0.001)},
+        'unique_count': {'count': (1, 2)},
+        'cluster': {'cluster_id': cluster_id},
+        'cluster_patient': {'cluster_id': cluster_id, 'pt_id': [pt_id]},
+        'patient_svtype': {'pt_id': [pt_id], 'svtype': [svtype]},
+        'gene_list': {'rs_list': 'MECP2, SHANK3, SCN1A'},
+    }
+
+
+def explain(conn, qry: str, params: dict) -> list[str]:
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {qry}', params)]
+
+
+def call_table_access(plan: list[str]) -> list[str]:
+    """Columns the call table (aliased p) is searched on; [] for a full scan."""
+    for detail in plan:
+        m = re.match(r'SEARCH p USING (?:COVERING )?INDEX \S+ \((.+)\)', detail)
+        if m:
+            return [re.split(r'[=<>]', c)[0] for c in m.group(1).split(' AND ')]
+    return []
+
+
+def plan_issues(plan: list[str], columns: list[str]) -> list[str]:
+    """Full scans, join-driven scans and partial index use of the call table, and temp B-trees."""
+    issues = [detail for detail in plan if 'USE TEMP B-TREE' in detail]
+    access = [c for c in call_table_access(plan) if c in columns]
+    if not columns:
+        return issues
+    if 'SCAN p' in plan:
+        issues.append('full scan of call table')
+    elif not access:
+        issues.append('call table reached through the meta join, filters not indexed')
+    elif len(access) < len(columns):
+        issues.append(f"index only covers ({', '.join(access)}) of ({', '.join(columns)})")
+    return issues
+
+
+def _collapse_groups(where: str) -> str:
+    # replace each top-level parenthesized group by a token describing it
+    out, depth, start = [], 0, 0
+    for i, ch in enumerate(where):
+        if ch == '(':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                inner = where[start + 1:i].strip()
+                if inner.startswith('SELECT value FROM tmp_'):
+                    out.append('(LIST)')
+                elif inner.upper().startswith('SELECT'):
+                    out.append('(SUBQUERY)')
+                elif ' OR ' in inner:
+                    out.append('(OR)')
+                else:
+                    out.append('(LIST)')
+        elif depth == 0:
+            out.append(ch)
+    return ''.join(out)
+
+
+def candidate_index(qry: str, plan: list[str]) -> list[str]:
+    """Equality columns, then the first range column (or the ORDER BY columns for a sort)."""
+    where = qry.split(' WHERE ', 1)[1]
+    order = re.search(r' ORDER BY (.+?)(?: LIMIT |$)', where)
+    where = re.split(r' ORDER BY | LIMIT ', where)[0]
+    where = _collapse_groups(where)
+    where = re.sub(r'BETWEEN (\S+) AND (\S+)', r'BETWEEN \1~\2', where)
+
+    eq, rng = [], []
+    for term in where.split(' AND '):
+        m = re.match(r'\s*(?:p\.)?(\w+)\s+(=|IN|>=|<=|>|<|BETWEEN)\s+(\S+)', term)
+        if not m or m.group(3) == '(SUBQUERY)':
+            continue
+        col, op = m.group(1), m.group(2)
+        target = eq if op in ('=', 'IN') else rng
+        if col not in eq and col not in rng:
+            target.append(col)
+
+    if order and any('TEMP B-TREE' in detail for detail in plan):
+        order_cols = [c.strip().split(' ')[0].replace('p.', '') for c in order.group(1).split(',')]
+        return eq + [c for c in order_cols if c not in eq]
+    return eq + rng[:1]
+
+
+def existing_indices(conn, table_name: str) -> list[list[str]]:
+    indices = []
+    for _, name, *_ in conn.execute(f'PRAGMA index_list({table_name})'):
+        indices.append([row[2] for row in conn.execute(f'PRAGMA index_info({name})')])
+    return indices
+
+
+def advise_table(engine_url: str, table_name: str) -> list[list[str]]:
+    """Replay the representative queries on one table; return the composite indexes worth keeping."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    kept = []
+    print(f'--- Index advisor: {table_name} ---')
+    for name, overrides in representative_queries(conn, table_name).items():
+        qry_dict = default_qry_dict()
+        qry_dict.update(overrides)
+        qry, params = search_build(qry_dict, table_name)
+        params = bind_list_params(conn, params)
+        try:
+            plan = explain(conn, qry, params)
+        except sq.OperationalError as e:
+            print(f'[{name}] skipped: {e}')
+            continue
+        columns = candidate_index(qry, plan)
+        issues = plan_issues(plan, columns)
+        if not issues:
+            print(f'[{name}] ok')
+            continue
+        print(f'[{name}] ' + '; '.join(issues))
+
+        if not columns:
+            print('    no indexable predicate')
+            continue
+        if columns in existing_indices(conn, table_name):
+            print(f"    ({', '.join(columns)}) already exists")
+            continue
+
+        index_name = composite_index_name(table_name, columns)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})")
+        conn.execute(f'ANALYZE {index_name}')
+        new_plan = explain(conn, qry, params)
+        if any(index_name in detail for detail in new_plan) and len(plan_issues(new_plan, columns)) < len(issues):
+            print(f"    built ({', '.join(columns)})")
+            kept.append(columns)
+        else:
+            print(f"    ({', '.join(columns)}) not used by the planner, dropped")
+            conn.execute(f'DROP INDEX {index_name}')
+    conn.commit()
+    conn.close()
+    return kept
+
+
+def save_advised_indices(config_file: str, db_name: str, table_name: str, indices: list[list[str]]) -> str:
+    """Add the advised indexes of one table to the config's .advised.yaml; returns its path."""
+    advised_file = advised_config_path(config_file)
+    data = {}
+    if os.path.exists(advised_file):
+        with open(advised_file, 'r') as f:
+            data = yaml.safe_load(f) or {}
+    tables = data.setdefault('databases', {}).setdefault(db_name, {})
+    existing = tables.get(table_name) or []
+    tables[table_name] = existing + [c for c in indices if c not in existing]
+    with open(advised_file, 'w') as f:
+        f.write('# written by `python -m helper.to_sqlite --advise`; merged into composite_indices on load\n')
+        yaml.safe_dump(data, f, sort_keys=False, default_flow_style=None)
+    return advised_file
+
+
+def run_advisor(config_file: str, config):
+    db_name = config.engine_url.replace('sqlite:///', '')
+    for job in config.table_jobs:
+        kept = advise_table(config.engine_url, job.table_name)
+        if kept:
+            advised_file = save_advised_indices(config_file, db_name, job.table_name, kept)
+            print(f'saved {len(kept)} index(es) for {job.table_name} to {advised_file}')
@@ -0,0 +1,82 @@
+"""
+Prioritization score of each call, computed at load time by helper/to_sqlite so the
+Query page's 'Top score' mode walks the (priority_score, UUID) index instead of sorting.
+
+Every component is scaled to 0..1 and the score is their weighted mean (0..1):
+    gnomAD_AF            1 when absent from gnomAD, falling to 0 at RARE_FREQ
+    PSEUDO_FREQ          the same on the cohort frequency
+    OMIM                 overlaps an OMIM gene (OMIM_count > 0)
+    ClinGen              overlaps a ClinGen dosage gene: HI for DEL, TS for DUP, either otherwise
+    collins              the same on the Collins et al. HI/TS predictions
+    DECIPHER             overlaps a DECIPHER region
+    proband_propensity   proband_only_propensity
+Weights are set per table job (score_weights in sqlite_config.yaml); components whose
+columns are missing score 0.
+"""
+import numpy as np
+import pandas as pd
+
+RARE_FREQ = 0.01
+DEFAULT_SCORE_WEIGHTS = {
+    'gnomAD_AF': 2.0,
+    'PSEUDO_FREQ': 2.0,
+    'OMIM': 1.5,
+    'ClinGen': 1.5,
+    'collins': 1.0,
+    'DECIPHER': 1.0,
+    'proband_propensity': 1.0,
+}
+
+
+def column(chunk: pd.DataFrame, col: str, default: float = 0.0) -> np.ndarray:
+    if col not in chunk.columns:
+        return np.full(len(chunk), default)
+    return pd.to_numeric(chunk[col], errors='coerce').fillna(default).to_numpy(dtype=float)
+
+
+def rarity(chunk: pd.DataFrame, col: str) -> np.ndarray:
+    return 1 - np.clip(column(chunk, col) / RARE_FREQ, 0, 1)
+
+
+def dosage(chunk: pd.DataFrame, prefix: str) -> np.ndarray:
+    hi = column(chunk, f'{prefix}_HI') > 0
+    ts = column(chunk, f'{prefix}_TS') > 0
+    svtype = chunk['SV_TYPE'].astype(str).to_numpy() if 'SV_TYPE' in chunk.columns else np.full(len(chunk), '')
+    return np.select([svtype == 'DEL', svtype == 'DUP'], [hi, ts], hi | ts).astype(float)
+
+
+def decipher(chunk: pd.DataFrame) -> np.ndarray:
+    if 'DECIPHER' not in chunk.columns:
+        return np.zeros(len(chunk))
+    names = chunk['DECIPHER'].astype(str).str.strip()
+    return (chunk['DECIPHER'].notna() & ~names.isin(['', '0', '0.0'])).to_numpy(dtype=float)
+
+
+SCORE_COMPONENTS = {
+    'gnomAD_AF': lambda chunk: rarity(chunk, 'gnomAD_AF'),
+    'PSEUDO_FREQ': lambda chunk: rarity(chunk, 'PSEUDO_FREQ'),
+    'OMIM': lambda chunk: (column(chunk, 'OMIM_count') > 0).astype(float),
+    'ClinGen': lambda chunk: dosage(chunk, 'ClinGen'),
+    'collins': lambda chunk: dosage(chunk, 'collins'),
+    'DECIPHER': decipher,
+    'proband_propensity': lambda chunk: np.clip(column(chunk, 'proband_only_propensity'), 0, 1),
+}
+
+
+def score_weights(weights: dict = None) -> dict:
+    """DEFAULT_SCORE_WEIGHTS overridden by weights; unknown components are an error."""
+    unknown = set(weights or {}) - set(SCORE_COMPONENTS)
+    if unknown:
+        raise ValueError(f'unknown score components {sorted(unknown)}; expected {list(SCORE_COMPONENTS)}')
+    merged = {**DEFAULT_SCORE_WEIGHTS, **(weights or {})}
+    if sum(merged.values()) <= 0:
+        raise ValueError('score weights must sum to more than 0')
+    return merged
+
+
+def assign_score(chunk: pd.DataFrame, weights: dict = None) -> pd.DataFrame:
+    """Add the priority_score column to a chunk of calls."""
+    weights = score_weights(weights)
+    total = sum(weights[name] * SCORE_COMPONENTS[name](chunk) for name in weights if weights[name])
+    chunk['priority_score'] = np.round(total / sum(weights.values()), 4)
+    return chunk
@@ -0,0 +1,73 @@
+"""
+FTS5 keyword index over the annotation text of a call table, so a disease or phenotype
+keyword is an index lookup instead of a LIKE scan.
+
+{table}_fts holds one document per distinct annotation, not one per call; each source
+reaches call UUIDs through an indexed link built by helper/to_sqlite:
+    source     key          text                    linked through
+    OMIM       gene symbol  OMIM disease names      {table}_genes (source 'OMIM')
+    DECIPHER   region name  the region name         {table}_regions
+    ISCA       region name  the region name         {table}_regions
+    phenotype  pt_id        the sample phenotype    {table}.PT_ID
+query.search_filters.keyword_filter builds the matching join.
+"""
+import pandas as pd
+import sqlite3 as sq
+
+OMIM_COLUMNS = ['chrom', 'start', 'end', 'gene_symbol', 'disease', 'pheno_key']
+TOKENIZER = 'porter unicode61 remove_diacritics 2'
+
+
+def table_exists(conn, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def omim_documents(omim_file: str) -> pd.DataFrame:
+    """One document per OMIM gene: its disease names, '; '-joined."""
+    omim = pd.read_csv(omim_file, sep='\t', index_col=False, header=0, names=OMIM_COLUMNS)
+    omim = omim.dropna(subset=['gene_symbol', 'disease'])
+    omim['key'] = omim['gene_symbol'].astype(str).str.strip().str.upper()
+    docs = omim.groupby('key')['disease'].agg(lambda d: '; '.join(dict.fromkeys(d.astype(str))))
+    return docs.rename('text').reset_index().assign(source='OMIM')
+
+
+def region_documents(conn, table_name: str) -> pd.DataFrame:
+    if not table_exists(conn, f'{table_name}_regions'):
+        return pd.DataFrame(columns=['text', 'source', 'key'])
+    docs = pd.read_sql(f'SELECT DISTINCT region_name AS key, source FROM {table_name}_regions', conn)
+    return docs.assign(text=docs['key'])
+
+
+def phenotype_documents(conn, table_name: str) -> pd.DataFrame:
+    # sample metadata of the table's genome build, as joined by query.search_filters.search_where
+    meta_table = f"meta_{table_name.split('_')[-1]}"
+    if not table_exists(conn, meta_table):
+        return pd.DataFrame(columns=['text', 'source', 'key'])
+    docs = pd.read_sql(
+        f'SELECT pt_id AS key, phenotype AS text FROM {meta_table} WHERE phenotype IS NOT NULL', conn)
+    return docs.assign(key=docs['key'].astype(str), source='phenotype')
+
+
+def write_text_index(engine_url: str, table_name: str, omim_file: str = None):
+    """Rebuild {table_name}_fts from the OMIM file, the region child table and the sample metadata."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    frames = [region_documents(conn, table_name), phenotype_documents(conn, table_name)]
+    if omim_file:
+        frames.append(omim_documents(omim_file))
+    docs = pd.concat(frames, ignore_index=True)[['text', 'source', 'key']]
+
+    fts_table = f'{table_name}_fts'
+    print(f'building {fts_table} ({len(docs.index)} documents)')
+    conn.execute(f'DROP TABLE IF EXISTS {fts_table}')
+    conn.execute(
+        f'CREATE VIRTUAL TABLE {fts_table} USING fts5('
+        f"text, source UNINDEXED, key UNINDEXED, tokenize = '{TOKENIZER}')"
+    )
+    conn.executemany(f'INSERT INTO {fts_table} (text, source, key) VALUES (?, ?, ?)',
+                     docs.itertuples(index=False, name=None))
+    conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
@@ -0,0 +1,114 @@
+"""
+Export a loaded SQLite DB to Parquet for the DuckDB query backend (query/backend.py).
+
+Call tables are written hive-partitioned by chrom1 and SV_TYPE and sorted by pos1,
+so DuckDB skips whole files on the common chromosome/type filters and row groups
+on position; every other table (genes, regions, clusters, meta, HPO, db_version)
+becomes a single file:
+    {parquet_dir}/{table}/chrom1=1/SV_TYPE=DEL/part-0.parquet
+    {parquet_dir}/{table}_genes.parquet
+The partition columns are kept inside the files so both backends return the same columns.
+
+Every file of a table gets one Arrow schema, taken from the declared SQLite column types
+(pandas would infer each chunk's types separately, and DuckDB cannot read a column that is
+BIGINT in one file and VARCHAR in another); chromosome columns are always text.
+"""
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import sqlite3 as sq
+
+PARTITION_COLUMNS = ['chrom1', 'SV_TYPE']
+CHROM_COLUMNS = ['chrom1', 'chrom2']
+
+
+def declared_type(decl: str):
+    """Arrow type of a SQLite declared type by its affinity rules; None when they give no type."""
+    decl = decl.upper()
+    if 'INT' in decl:
+        return pa.int64()
+    if any(t in decl for t in ('CHAR', 'CLOB', 'TEXT')):
+        return pa.string()
+    if any(t in decl for t in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return None
+
+
+def inferred_type(values: pd.Series) -> pa.DataType:
+    """Arrow type of a column with no declared type; text when it is empty or mixes types."""
+    try:
+        arrow_type = pa.array(values, from_pandas=True).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # e.g. integers and 'X' in one object column
+        return pa.string()
+    return pa.string() if pa.types.is_null(arrow_type) else arrow_type
+
+
+def table_schema(conn, table_name: str, sample: pd.DataFrame) -> pa.Schema:
+    """Arrow schema from the declared column types; undeclared columns take sample's inferred type."""
+    fields = []
+    for _, name, decl, *_ in conn.execute(f'PRAGMA table_info({table_name})'):
+        if name in CHROM_COLUMNS:
+            arrow_type = pa.string()
+        else:
+            arrow_type = declared_type(decl or '')
+            if arrow_type is None:
+                arrow_type = inferred_type(sample[name])
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def chrom_text(values: pd.Series) -> pd.Series:
+    # a numeric-affinity chrom column reads back as int, or as float when it has NULLs
+    return values.map(lambda v: None if pd.isna(v) else str(int(v)) if isinstance(v, float) else str(v))
+
+
+def conform(df: pd.DataFrame, schema: pa.Schema) -> pd.DataFrame:
+    """df ready to be written with schema: chromosomes as text, mixed text columns as str."""
+    df = df.copy()
+    for f in schema:
+        if f.name in CHROM_COLUMNS:
+            df[f.name] = chrom_text(df[f.name])
+        elif pa.types.is_string(f.type):
+            df[f.name] = df[f.name].map(lambda v: v if v is None or isinstance(v, str) else None if pd.isna(v) else str(v))
+    return df
+
+
+def write_partitioned(conn, table_name: str, out_dir: str, chunksize: int):
+    schema = None
+    for n, chunk in enumerate(pd.read_sql(f'SELECT * FROM {table_name}', conn, chunksize=chunksize)):
+        if schema is None:
+            schema = table_schema(conn, table_name, chunk)
+        chunk = conform(chunk, schema)
+        for (chrom, svtype), part in chunk.groupby(PARTITION_COLUMNS, dropna=False):
+            part_dir = os.path.join(out_dir, f'chrom1={chrom}', f'SV_TYPE={svtype}')
+            os.makedirs(part_dir, exist_ok=True)
+            part.sort_values('pos1').to_parquet(os.path.join(part_dir, f'part-{n}.parquet'),
+                                                index=False, schema=schema)
+
+
+def write_parquet(engine_url: str, parquet_dir: str, call_tables: list[str], chunksize: int = 1_000_000):
+    """Replace the Parquet copy of every table in the DB; call_tables are partitioned."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    # FTS5 keyword indexes (helper/text_index) and their shadow tables are SQLite-only
+    virtual = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'")]
+    tables = [t for t in tables if not any(t == v or t.startswith(f'{v}_') for v in virtual)]
+    os.makedirs(parquet_dir, exist_ok=True)
+    # db_version goes last: the app reloads its DuckDB views when it changes
+    for table_name in sorted(tables, key=lambda t: t == 'db_version'):
+        out_dir = os.path.join(parquet_dir, table_name)
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        if table_name in call_tables:
+            write_partitioned(conn, table_name, out_dir, chunksize)
+        else:
+            df = pd.read_sql(f'SELECT * FROM {table_name}', conn)
+            schema = table_schema(conn, table_name, df)
+            conform(df, schema).to_parquet(f'{out_dir}.parquet', index=False, schema=schema)
+        print(f'{table_name} -> {parquet_dir}')
+    conn.close()
@@ -2,13 +2,22 @@
 Load TSV/CSV files into SQLite with configurable engine, inputs, metadata, and table names.
 Edit CONFIG below to swap datasets and run multiple reload jobs.
 """
+import os
 import glob
+import argparse
 import yaml
+import numpy as np
 import pandas as pd
 import sqlite3 as sq
 from sqlalchemy import create_engine
 from dataclasses import dataclass, field
 from typing import Optional, List
+from helper.binning import reg2bins
+from helper.hpo_closure import write_hpo_to_DB
+from helper.cluster_association import write_cluster_association
+from helper.priority_score import assign_score, score_weights
+from helper.text_index import write_text_index
+from helper.to_parquet import write_parquet
 
 pd.set_option('display.expand_frame_repr', False)
 
@@ -24,6 +33,17 @@ class TableLoadJob:
     table_name: str
     chunksize: int = 100_000
     index_columns: Optional[list[str]] = None  # columns to create indexes on
+    gene_index: bool = True  # build the {table_name}_genes symbol -> UUID child table
+    bin_index: bool = True  # add a UCSC bin column indexed on (chrom1, bin)
+    composite_indices: Optional[list[list[str]]] = None  # multi-column indexes, e.g. [chrom1, SV_TYPE, pos1]
+    cluster_table: bool = True  # build clusters_{table_name}, one row per CLUSTER_ID
+    cluster_association: Optional[str] = 'fisher'  # proband enrichment test per cluster: fisher, binomial or null
+    text_index: bool = True  # build {table_name}_regions and the {table_name}_fts keyword index
+    omim_file: Optional[str] = None  # OMIM_sorted.bed of the table's genome build, for disease names
+    denormalize_meta: bool = False  # copy sex/phenotype from meta_{ref} into the table; searches skip the join
+    priority_score: bool = True  # add a priority_score column indexed on (priority_score, UUID)
+    score_weights: Optional[dict] = None  # component -> weight overrides, see helper/priority_score.py
+    gene_counts: bool = True  # build gene_counts_/sample_counts_{table_name} for the gene summary (needs gene_index)
 
 
 @dataclass
@@ -34,17 +54,42 @@ class MetaLoadJob:
     columns: list[str]  # e.g. ['pt_id', 'sex', 'phenotype']
 
 
+@dataclass
+class HpoLoadJob:
+    """HPO ontology closure + term → gene annotations (see helper/hpo_closure.py)."""
+    obo_file: str
+    genes_file: str
+
+
 @dataclass
 class Config:
     engine_url: str 
     table_jobs: list[TableLoadJob] = field(default_factory=list)
     meta_jobs: list[MetaLoadJob] = field(default_factory=list)
+    hpo_job: Optional[HpoLoadJob] = None
+    parquet_dir: Optional[str] = None  # also export to Parquet for the DuckDB backend
+
+
+def advised_config_path(filepath: str) -> str:
+    """sqlite_config.yaml -> sqlite_config.advised.yaml, written by helper/index_advisor."""
+    root, ext = os.path.splitext(filepath)
+    return f'{root}.advised{ext}'
+
+
+def load_advised_indices(filepath: str) -> dict:
+    """{db_name: {table_name: [[column, ...], ...]}} saved by `--advise` next to the config, or {}."""
+    advised_file = advised_config_path(filepath)
+    if not os.path.exists(advised_file):
+        return {}
+    with open(advised_file, 'r') as f:
+        return (yaml.safe_load(f) or {}).get('databases', {})
 
 
 def load_config_from_yaml(filepath: str) -> List[Config]:
     """Hook to read YAML and transform it into a list of Config objects."""
     with open(filepath, 'r') as f:
         data = yaml.safe_load(f)
+    advised = load_advised_indices(filepath)
     
     configs = []
     for db_entry in data.get('databases', []):
@@ -52,17 +97,27 @@ def load_config_from_yaml(filepath: str) -> List[Config]:
         table_jobs = [
             TableLoadJob(**job) for job in db_entry.get('table_jobs', [])
         ]
+        # advised indexes are kept out of the hand-edited config and added here
+        for job in table_jobs:
+            existing = list(job.composite_indices or [])
+            extra = advised.get(db_entry['db_name'], {}).get(job.table_name, [])
+            job.composite_indices = existing + [c for c in extra if c not in existing] or None
         
         # Build MetaLoadJobs
         meta_jobs = [
             MetaLoadJob(**job) for job in db_entry.get('meta_jobs', [])
         ]
         
+        # Build HpoLoadJob
+        hpo_job = HpoLoadJob(**db_entry['hpo_job']) if db_entry.get('hpo_job') else None
+        
         # Create the main Config object
         configs.append(Config(
             engine_url=f"sqlite:///{db_entry['db_name']}",
             table_jobs=table_jobs,
-            meta_jobs=meta_jobs
+            meta_jobs=meta_jobs,
+            hpo_job=hpo_job,
+            parquet_dir=db_entry.get('parquet_dir'),
         ))
     return configs
 
@@ -79,8 +134,102 @@ def write_meta_to_DB(engine_url: str, input_file: str, table_name: str, columns:
     df = pd.read_csv(input_file, sep='\t')
     df = df[columns]
     print(df)
+    duplicated = df['pt_id'].duplicated()
+    if duplicated.any():
+        print(f"dropping duplicate pt_id rows: {df.loc[duplicated, 'pt_id'].tolist()}")
+        df = df[~duplicated]
     engine = get_engine(engine_url)
-    df.to_sql(table_name, con=engine, if_exists='replace', index=False)
+    # pt_id PRIMARY KEY: the call-table join probes the key index instead of scanning the table
+    delete_table(engine_url, table_name)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(pd.io.sql.get_schema(df, table_name, keys='pt_id', con=conn))
+    df.to_sql(table_name, con=engine, if_exists='append', index=False)
+
+
+# meta columns copied into the call tables by denormalize_meta
+DENORMALIZED_META_COLUMNS = ['sex', 'phenotype']
+
+
+def denormalize_meta(engine_url: str, table_name: str):
+    """Copy sex and phenotype of each call's sample from meta_{ref} into the call table."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    meta_table = f"meta_{table_name.split('_')[-1]}"
+    meta_columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({meta_table})')}
+    if not set(DENORMALIZED_META_COLUMNS) <= meta_columns:
+        print(f'{meta_table} has no {DENORMALIZED_META_COLUMNS} columns; not denormalizing {table_name}')
+        conn.close()
+        return
+    print(f'copying {DENORMALIZED_META_COLUMNS} from {meta_table} into {table_name}')
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table_name})')}
+    for col in DENORMALIZED_META_COLUMNS:
+        if col not in columns:
+            cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN {col} TEXT')
+    assignments = ', '.join(
+        f'{col} = (SELECT m.{col} FROM {meta_table} m WHERE m.pt_id = {table_name}.PT_ID)'
+        for col in DENORMALIZED_META_COLUMNS
+    )
+    cursor.execute(f'UPDATE {table_name} SET {assignments}')
+    conn.commit()
+    conn.close()
+
+
+# ';'-joined gene symbol columns on the call tables, keyed by the source name
+# stored in the gene child table
+GENE_SYMBOL_COLUMNS = {
+    'RefSeq': 'RefSeq_symbol',
+    'OMIM': 'OMIM_symbol',
+}
+
+
+# ';'-joined DECIPHER/ISCA region name columns (0 when none overlaps), keyed by the source
+# name stored in the region child table
+REGION_NAME_COLUMNS = {
+    'DECIPHER': 'DECIPHER',
+    'ISCA': 'ISCA',
+}
+
+
+def explode_names(chunk: pd.DataFrame, columns: dict, name_col: str, upper: bool = False) -> pd.DataFrame:
+    """Split ';'-joined name columns into one (name_col, source, UUID) row per name."""
+    frames = []
+    for source, col in columns.items():
+        if col not in chunk.columns:
+            continue
+        names = chunk[['UUID', col]].dropna(subset=[col])
+        names = names.assign(**{name_col: names[col].astype(str).str.split(';')}).explode(name_col)
+        names[name_col] = names[name_col].str.strip()
+        if upper:
+            names[name_col] = names[name_col].str.upper()
+        names = names[~names[name_col].isin(['', '0'])]
+        names['source'] = source
+        frames.append(names[[name_col, 'source', 'UUID']])
+    if not frames:
+        return pd.DataFrame(columns=[name_col, 'source', 'UUID'])
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+
+def explode_gene_symbols(chunk: pd.DataFrame) -> pd.DataFrame:
+    return explode_names(chunk, GENE_SYMBOL_COLUMNS, 'gene_symbol', upper=True)
+
+
+def explode_region_names(chunk: pd.DataFrame) -> pd.DataFrame:
+    return explode_names(chunk, REGION_NAME_COLUMNS, 'region_name')
+
+
+def assign_bin(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Add the UCSC bin of each call: pos1..pos2 when on one chromosome, pos1 alone otherwise."""
+    pos1 = chunk['pos1'].fillna(0).astype('int64').clip(lower=0).to_numpy()
+    pos2 = chunk['pos2'].fillna(0).astype('int64').clip(lower=0).to_numpy()
+    if 'chrom2' in chunk.columns:
+        same_chrom = (chunk['chrom1'].astype(str) == chunk['chrom2'].astype(str)).to_numpy()
+    else:
+        same_chrom = np.ones(len(chunk), dtype=bool)
+    lo = np.where(same_chrom, np.minimum(pos1, pos2), pos1)
+    hi = np.where(same_chrom, np.maximum(pos1, pos2), pos1)
+    chunk['bin'] = reg2bins(lo, hi + 1)
+    return chunk
 
 
 def write_to_DB(
@@ -88,8 +237,16 @@ def write_to_DB(
     input_glob: str,
     table_name: str,
     chunksize: int = 100_000,
+    gene_index: bool = True,
+    bin_index: bool = True,
+    text_index: bool = True,
+    priority_score: bool = True,
+    weights: Optional[dict] = None,
 ):
     engine = get_engine(engine_url)
+    if priority_score:
+        weights = score_weights(weights)  # fail on a misspelled component before loading anything
+        print(f'priority_score weights: {weights}')
     fnames = glob.glob(input_glob)
     print(fnames)
     for fn in fnames:
@@ -97,7 +254,68 @@ def write_to_DB(
         reader = pd.read_csv(fn, sep='\t', chunksize=chunksize, low_memory=False)
         for idx, chunk in enumerate(reader):
             print(f'processing chunk {idx}')
+            if bin_index:
+                chunk = assign_bin(chunk)
+            if priority_score:
+                chunk = assign_score(chunk, weights)
             chunk.to_sql(table_name, con=engine, if_exists='append', index=False)
+            if gene_index:
+                genes = explode_gene_symbols(chunk)
+                if not genes.empty:
+                    genes.to_sql(f'{table_name}_genes', con=engine, if_exists='append', index=False)
+            if text_index:
+                regions = explode_region_names(chunk)
+                if not regions.empty:
+                    regions.to_sql(f'{table_name}_regions', con=engine, if_exists='append', index=False)
+
+
+def create_gene_index(engine_url: str, table_name: str):
+    """Index the gene child table so gene filters become an indexed semi-join on UUID."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f'{table_name}_genes',)
+    ).fetchone()
+    if exists:
+        print(f'indexing {table_name}_genes')
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table_name}_genes_symbol_index '
+            f'ON {table_name}_genes (gene_symbol, source, UUID)'
+        )
+    conn.commit()
+    conn.close()
+
+
+def create_region_index(engine_url: str, table_name: str):
+    """Index the region child table so keyword hits on DECIPHER/ISCA names reach their calls."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f'{table_name}_regions',)
+    ).fetchone()
+    if exists:
+        print(f'indexing {table_name}_regions')
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table_name}_regions_name_index '
+            f'ON {table_name}_regions (region_name, source, UUID)'
+        )
+    conn.commit()
+    conn.close()
+
+
+def create_score_index(engine_url: str, table_name: str):
+    """Index (priority_score, UUID) so top-K by score is a backward index walk."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    print(f'indexing {table_name} priority_score')
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS {table_name}_priority_score_index ON {table_name} (priority_score, UUID)'
+    )
+    conn.commit()
+    conn.close()
 
 
 def create_index(engine_url: str, table_name: str, index_columns: list[str]):
@@ -107,7 +325,45 @@ def create_index(engine_url: str, table_name: str, index_columns: list[str]):
     cursor = conn.cursor()
     for col in index_columns:
         print(col)
-        cursor.execute(f'CREATE INDEX IF NOT EXISTS {col}_index ON {table_name} ({col})')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {table_name}_{col}_index ON {table_name} ({col})')
+    conn.commit()
+    conn.close()
+
+
+def composite_index_name(table_name: str, columns: list[str]) -> str:
+    return f"{table_name}_{'_'.join(columns)}_index"
+
+
+def create_composite_index(engine_url: str, table_name: str, composite_indices: list[list[str]]):
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    for columns in composite_indices:
+        print(columns)
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {composite_index_name(table_name, columns)} '
+            f"ON {table_name} ({', '.join(columns)})"
+        )
+    conn.commit()
+    conn.close()
+
+
+def analyze(engine_url: str):
+    """Refresh sqlite_stat1 so the planner can choose between the single and composite indexes."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+
+
+def create_bin_index(engine_url: str, table_name: str):
+    """Index (chrom1, bin) so region filters become a few index range probes."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    print(f'indexing {table_name} bins')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {table_name}_bin_index ON {table_name} (chrom1, bin)')
     conn.commit()
     conn.close()
 
@@ -123,19 +379,150 @@ def delete_table(engine_url: str, table_name: str):
     print('deleted table')
 
 
+# clusters_{table} columns: (call table column, aggregate). Frequencies and counts are
+# constant within a cluster; annotations roll up to the strongest value of any member.
+CLUSTER_AGGREGATES = [
+    ('chrom1', 'MIN'), ('chrom2', 'MIN'), ('SV_TYPE', 'MIN'),
+    ('pos1', 'AVG'), ('pos2', 'AVG'), ('SV_LEN', 'AVG'),
+    ('COUNT', 'MAX'), ('UNIQUE_PT_COUNT', 'MAX'), ('PSEUDO_FREQ', 'MAX'),
+    ('proband_only_count', 'MAX'), ('proband_only_propensity', 'MAX'),
+    ('nonproband_only_count', 'MAX'), ('nonproband_only_propensity', 'MAX'),
+    ('gnomAD_AF', 'MAX'), ('TopMED_AF', 'MAX'),
+    ('SD_overlap', 'MAX'), ('OMIM_count', 'MAX'), ('RefSeq_count', 'MAX'),
+    ('collins_HI', 'MAX'), ('collins_TS', 'MAX'), ('ClinGen_HI', 'MAX'), ('ClinGen_TS', 'MAX'),
+    ('DECIPHER', 'MAX'), ('ISCA', 'MAX'), ('imprinting_genes', 'MAX'),
+]
+CLUSTER_INDICES = [
+    ['CLUSTER_ID'], ['chrom1', 'pos1', 'CLUSTER_ID'], ['chrom2', 'pos2', 'CLUSTER_ID'],
+    ['SV_TYPE'], ['UNIQUE_PT_COUNT'], ['PSEUDO_FREQ'],
+    ['proband_only_propensity'], ['nonproband_only_propensity'], ['gnomAD_AF'],
+]
+
+
+def create_cluster_table(engine_url: str, table_name: str):
+    """One row per CLUSTER_ID (noise -1 excluded) with consensus coordinates, counts and rollups."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    # column -> declared type; CREATE TABLE AS would leave MIN/MAX columns without one, and a
+    # column with no affinity never equals the text chromosome the Query page binds
+    columns = {row[1]: row[2] for row in cursor.execute(f'PRAGMA table_info({table_name})')}
+    if 'CLUSTER_ID' not in columns:
+        conn.close()
+        return
+    select = {
+        'CLUSTER_ID': ('CLUSTER_ID', columns['CLUSTER_ID'] or 'INTEGER'),
+        'n_calls': ('COUNT(*)', 'INTEGER'),
+        'min_pos1': ('MIN(pos1)', 'INTEGER'),
+        'max_pos2': ('MAX(pos2)', 'INTEGER'),
+    }
+    for col, agg in CLUSTER_AGGREGATES:
+        if col in columns:
+            if agg == 'AVG':
+                select[col] = (f'CAST(AVG({col}) AS INTEGER)', 'INTEGER')
+            else:
+                # chromosomes are text, as in the Parquet export, whatever the call table declared
+                select[col] = (f'{agg}({col})', 'TEXT' if col in ('chrom1', 'chrom2') else columns[col])
+    cluster_table = f'clusters_{table_name}'
+    print(f'building {cluster_table}')
+    cursor.execute(f'DROP TABLE IF EXISTS {cluster_table}')
+    cursor.execute(
+        f"CREATE TABLE {cluster_table} ({', '.join(f'{col} {decl}'.strip() for col, (_, decl) in select.items())})"
+    )
+    cursor.execute(
+        f"INSERT INTO {cluster_table} ({', '.join(select)}) "
+        f"SELECT {', '.join(expr for expr, _ in select.values())} "
+        f'FROM {table_name} WHERE CLUSTER_ID != -1 GROUP BY CLUSTER_ID'
+    )
+    built = {row[1] for row in cursor.execute(f'PRAGMA table_info({cluster_table})')}
+    for index_columns in CLUSTER_INDICES:
+        if set(index_columns) <= built:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {composite_index_name(cluster_table, index_columns)} '
+                f"ON {cluster_table} ({', '.join(index_columns)})"
+            )
+    conn.commit()
+    conn.close()
+
+
+def create_gene_counts(engine_url: str, table_name: str):
+    """Calls and carriers per gene, SV_TYPE and IS_PROBAND, and samples per IS_PROBAND as the denominator."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f'{table_name}_genes',)
+    ).fetchone()
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table_name})')}
+    if not exists or not {'SV_TYPE', 'IS_PROBAND', 'PT_ID'} <= columns:
+        conn.close()
+        return
+    print(f'building gene_counts_{table_name}')
+    cursor.execute(f'DROP TABLE IF EXISTS gene_counts_{table_name}')
+    # a symbol listed by both OMIM and RefSeq counts each call once
+    cursor.execute(
+        f'CREATE TABLE gene_counts_{table_name} AS '
+        f'SELECT g.gene_symbol, p.SV_TYPE, p.IS_PROBAND, '
+        f'COUNT(DISTINCT p.UUID) AS n_calls, COUNT(DISTINCT p.PT_ID) AS n_carriers '
+        f'FROM {table_name}_genes g JOIN {table_name} p ON p.UUID = g.UUID '
+        f'GROUP BY g.gene_symbol, p.SV_TYPE, p.IS_PROBAND'
+    )
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS gene_counts_{table_name}_gene_index '
+        f'ON gene_counts_{table_name} (gene_symbol, SV_TYPE, IS_PROBAND)'
+    )
+    cursor.execute(f'DROP TABLE IF EXISTS sample_counts_{table_name}')
+    cursor.execute(
+        f'CREATE TABLE sample_counts_{table_name} AS '
+        f'SELECT IS_PROBAND, COUNT(DISTINCT PT_ID) AS n_samples FROM {table_name} GROUP BY IS_PROBAND'
+    )
+    conn.commit()
+    conn.close()
+
+
+def write_db_version(engine_url: str):
+    """Bump the db_version row; the app drops its cached query results when it changes."""
+    db_path = engine_url.replace('sqlite:///', '')
+    conn = sq.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('CREATE TABLE IF NOT EXISTS db_version (version INTEGER, loaded_at TEXT)')
+    cursor.execute(
+        "INSERT INTO db_version SELECT COALESCE(MAX(version), 0) + 1, datetime('now') FROM db_version"
+    )
+    conn.commit()
+    conn.close()
+
+
 def run_config(config: Config, drop_tables_first: bool = True):
     """Run all table and metadata jobs from config."""
     for job in config.table_jobs:
         if drop_tables_first:
             delete_table(config.engine_url, job.table_name)
+            delete_table(config.engine_url, f'{job.table_name}_genes')
+            delete_table(config.engine_url, f'{job.table_name}_regions')
         write_to_DB(
             config.engine_url,
             job.input_glob,
             job.table_name,
             job.chunksize,
+            job.gene_index,
+            job.bin_index,
+            job.text_index,
+            job.priority_score,
+            job.score_weights,
         )
         if job.index_columns:
             create_index(config.engine_url, job.table_name, job.index_columns)
+        if job.composite_indices:
+            create_composite_index(config.engine_url, job.table_name, job.composite_indices)
+        if job.gene_index:
+            create_gene_index(config.engine_url, job.table_name)
+        if job.bin_index:
+            create_bin_index(config.engine_url, job.table_name)
+        if job.text_index:
+            create_region_index(config.engine_url, job.table_name)
+        if job.priority_score:
+            create_score_index(config.engine_url, job.table_name)
 
     for job in config.meta_jobs:
         write_meta_to_DB(
@@ -145,15 +532,54 @@ def run_config(config: Config, drop_tables_first: bool = True):
             job.columns,
         )
 
+    for job in config.table_jobs:
+        if job.denormalize_meta:
+            denormalize_meta(config.engine_url, job.table_name)
+        if job.cluster_table:
+            create_cluster_table(config.engine_url, job.table_name)
+            if job.cluster_association:
+                write_cluster_association(config.engine_url, job.table_name, job.cluster_association)
+        if job.gene_index and job.gene_counts:
+            create_gene_counts(config.engine_url, job.table_name)
+        # after the meta jobs: sample phenotypes are indexed too
+        if job.text_index:
+            write_text_index(config.engine_url, job.table_name, job.omim_file)
+
+    if config.hpo_job:
+        write_hpo_to_DB(
+            config.engine_url,
+            config.hpo_job.obo_file,
+            config.hpo_job.genes_file,
+        )
+
+    analyze(config.engine_url)
+    write_db_version(config.engine_url)
+
+    if config.parquet_dir:
+        write_parquet(
+            config.engine_url,
+            config.parquet_dir,
+            [job.table_name for job in config.table_jobs],
+        )
+
 
 def main():
+    parser = argparse.ArgumentParser(description='Load call tables into SQLite.')
+    parser.add_argument('--config', default='./helper/sqlite_config.yaml')
+    parser.add_argument('--advise', action='store_true',
+                        help='replay representative queries on the loaded DBs and build/save advised indexes')
+    args = parser.parse_args()
     # Now you just point to your external config file
-    config_file = './helper/sqlite_config.yaml'
+    config_file = args.config
     
     try:
         configs = load_config_from_yaml(config_file)
         
         for config in configs:
+            if args.advise:
+                from helper.index_advisor import run_advisor
+                run_advisor(config_file, config)
+                continue
             print(f"--- Starting Load: {config.engine_url} ---")
             run_config(config, drop_tables_first=True)
             
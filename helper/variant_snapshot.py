@@ -3,6 +3,7 @@ import pandas as pd
 import gzip
 import subprocess
 import streamlit.components.v1 as components
+from query.metadata import sample_record
 
 def vizCNV(chrom, start, end, refver, pr_df, pr_seg, pr_par2="NA", mo_seg="NA", fa_se="NA", \
     is_trio="FALSE", gvcf="NA", margin=25000, highlight="TRUE"):
@@ -90,42 +91,21 @@ def variant_snapshot(df, dataset, pipeline, ref, db, margin):
     GATK_path = "NA"
     is_trio = "FALSE"
 
-    # --- 3. Load Metadata based on Database Selection ---
+    # --- 3. Look Up the Sample in the Metadata Registry ---
     # Selects the correct metadata file based on the user's DB selection
-    if db == 'CLDB_SR' and 'hg19' in ref: 
-        meta = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t', index_col=False)
-        meta = meta[meta['pt_id'] == pt_id]
-        bam_path = meta['BAM_path'].squeeze()
-        P2_path = meta['P2_path'].squeeze()
-        MD_path = meta['MD_path'].squeeze()
-        GATK_path = meta['GATK_path'].squeeze()
-        is_trio = meta['is_trio'].squeeze()
-        
-    if db == 'CLDB_SR' and 'hg38' in ref: 
-        meta = pd.read_csv('/CLDB/meta/meta_SR_hg38.tsv', sep='\t', index_col=False)
-        meta = meta[meta['pt_id'] == pt_id]
-        bam_path = meta['BAM_path'].squeeze()
-        P2_path = meta['P2_path'].squeeze()
-        MD_path = meta['MD_path'].squeeze()
-        GATK_path = meta['GATK_path'].squeeze()
-        is_trio = meta['is_trio'].squeeze()
-        
-    if db == 'GREGoR_SR': 
-        meta = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t', index_col=False)
-        meta = meta[meta['pt_id'] == pt_id]
-        bam_path = meta['BAM_path'].squeeze()
-        P2_path = meta['P2_path'].squeeze()
-        MD_path = meta['MD_path'].squeeze()
-        GATK_path = meta['GATK_path'].squeeze()
-        is_trio = meta['is_trio'].squeeze()
-        
-    if db == 'CLDB_LR':
-        meta = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t', index_col=False)
-        meta = meta[meta['pt_id'] == pt_id]
+    meta = sample_record(db, ref, pt_id)
+    if meta is not None and db in ('CLDB_SR', 'GREGoR_SR'):
+        bam_path = meta['BAM_path']
+        P2_path = meta['P2_path']
+        MD_path = meta['MD_path']
+        GATK_path = meta['GATK_path']
+        is_trio = meta['is_trio']
+
+    if meta is not None and db == 'CLDB_LR':
         if ref == 'hg19':
-            bam_path = meta['BAM_path_hg19'].squeeze()
+            bam_path = meta['BAM_path_hg19']
         elif ref == 'hg38':
-            bam_path = meta['BAM_path_hg38'].squeeze()
+            bam_path = meta['BAM_path_hg38']
 
     # --- 4. Prepare BAM/CRAM Paths for IGV ---
     # Safe handling: verify bam_path is a string (not NaN/float from empty metadata)
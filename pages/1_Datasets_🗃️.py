@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
+from query.metadata import sample_metadata
 
 
 st.set_page_config(
@@ -53,19 +54,19 @@ cc_sr, cc_lr, gregor = st.tabs(['Carvalho Lab (SR)', 'Carvalho Lab (LR)', 'GREGo
 with cc_sr:
 	cc_sr_hg19, cc_sr_hg38 = st.tabs(['hg19', 'hg38'])
 	with cc_sr_hg19:
-		df = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t')
+		df = sample_metadata('CLDB_SR', 'hg19')
 		charts_tables(df,'Inheritance')	
 	with cc_sr_hg38:
 		st.write('Coming Soon')
 with cc_lr:
 	cc_lr_hg19, cc_lr_hg38 = st.tabs(['hg19', 'hg38'])
 	with cc_lr_hg19:
-		df = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t')
+		df = sample_metadata('CLDB_LR')
 		df=df.loc[df['has_LR_hg19']==1]
 		df.reset_index(inplace=True)
 		charts_tables(df,'Inheritance')	
 	with cc_lr_hg38:
-		df = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t')
+		df = sample_metadata('CLDB_LR')
 		df=df.loc[df['has_LR_hg38']==1]
 		df.reset_index(inplace=True)
 		charts_tables(df,'Inheritance')	
@@ -74,5 +75,5 @@ with gregor:
 	with gregor_hg19:
 		st.write('Coming Soon')
 	with gregor_hg38:
-		df = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t')
+		df = sample_metadata('GREGoR_SR')
 		charts_tables(df,'Pre-discovery OMIM disorders')	
\ No newline at end of file
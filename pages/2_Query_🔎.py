@@ -2,7 +2,7 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
-from query.query import final_query
+from query.query import final_query, federated_search
 
 st.set_page_config(
     page_title="Query",
@@ -11,7 +11,7 @@ st.set_page_config(
 )
 
 
-sr_tab, lr_tab = st.tabs(['Short Read', 'Long Read'])
+sr_tab, lr_tab, all_tab = st.tabs(['Short Read', 'Long Read', 'All Datasets'])
 with sr_tab:
 	sr_CC_hg19_tab, sr_CC_hg38_tab, sr_gg_hg38_tab = st.tabs(['Carvalho Lab(hg19)', 'Carvalho Lab(hg38)', 'GREGoR(hg38)'])
 	with sr_CC_hg19_tab:
@@ -50,3 +50,5 @@ with lr_tab:
 	with lr_CC_hg38_tab:
 		final_query('cldb', 'snf2', 'hg38', 'CLDB_LR')
 
+with all_tab:
+	federated_search()
@@ -0,0 +1,53 @@
+import time
+import pandas as pd
+import streamlit as st
+from query.telemetry import telemetry_settings, load_log, summarize_shapes
+
+st.set_page_config(
+	page_title="Telemetry",
+	page_icon="📈",
+	layout="wide"
+)
+
+st.title('Query Telemetry')
+
+if not telemetry_settings()['enabled']:
+	st.info('Telemetry is off. Set enabled and path under [telemetry] in .streamlit/secrets.toml to record queries.')
+	st.stop()
+
+# label -> days
+PERIODS = {'Last day': 1, 'Last 7 days': 7, 'Last 30 days': 30, 'Last year': 365}
+
+col1, col2 = st.columns(2)
+with col1:
+	period = st.selectbox('Period:', list(PERIODS), index=1)
+log = load_log(since=time.time() - PERIODS[period] * 86400)
+with col2:
+	dbs = st.multiselect('Dataset:', sorted(log['db'].dropna().unique()))
+if dbs:
+	log = log[log['db'].isin(dbs)]
+
+summary = summarize_shapes(log)
+if summary.empty:
+	st.write('No queries recorded in this period.')
+	st.stop()
+
+executed = log[log['cached'] == 0]
+col1, col2, col3 = st.columns(3)
+col1.metric('Queries', len(log.index))
+col2.metric('Cache hit rate', f"{log['cached'].mean():.0%}")
+col3.metric('Median latency', f"{executed['seconds'].median():.3f}s")
+
+columns = ['db', 'label', 'runs', 'cache_hits', 'mean_s', 'p95_s', 'max_s', 'mean_rows', 'max_MB', 'shape']
+slowest, frequent = st.tabs(['Slowest shapes', 'Most frequent shapes'])
+with slowest:
+	st.dataframe(summary.sort_values('p95_s', ascending=False)[columns], hide_index=True)
+with frequent:
+	st.dataframe(summary.sort_values('runs', ascending=False)[columns], hide_index=True)
+
+st.subheader('Query plan')
+shape = st.selectbox('Shape:', summary.sort_values('p95_s', ascending=False)['shape'], index=None)
+if shape is not None:
+	row = summary[summary['shape'] == shape].iloc[0]
+	st.code(row['shape'], language='sql')
+	st.code(row['plan'] or 'no plan recorded', language='text')
@@ -0,0 +1,141 @@
+"""
+Optional DuckDB backend. A dataset is served from its SQLite DB (query.connection)
+unless .streamlit/secrets.toml points it at a Parquet export (helper/to_parquet.py):
+
+	[duckdb.CLDB_SR]
+	parquet_dir = "/CLDB/parquet/CLDB_SR"
+
+The same SQL from search_filters runs on both; only the :name placeholders are rewritten.
+List-valued params become per-connection temp tables tmp_{name}(value) on either backend;
+a list of namedtuples becomes tmp_{name} with one column per field (query.batch uploads).
+"""
+import os
+import re
+import duckdb
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+from query.connection import get_engine
+
+# partition values from the directory names are strings, whatever they look like
+HIVE_TYPES = "{'chrom1': VARCHAR, 'SV_TYPE': VARCHAR}"
+PLACEHOLDER = re.compile(r'(?<![:\w]):(\w+)')
+
+
+def row_fields(value):
+	"""Column names of a list of namedtuples, or None for a list of plain values."""
+	return getattr(value[0], '_fields', None) if len(value) else None
+
+
+def bind_list_params(dbapi_conn, params):
+	"""Load list params into TEMP tables on a sqlite3 connection; returns the scalar params."""
+	lists = {name: value for name, value in params.items() if isinstance(value, (list, tuple))}
+	if not lists:
+		return params
+	# query_only blocks temp tables too; the file itself stays read-only through mode=ro
+	query_only = dbapi_conn.execute('PRAGMA query_only').fetchone()[0]
+	dbapi_conn.execute('PRAGMA query_only = OFF')
+	try:
+		for name, value in lists.items():
+			dbapi_conn.execute(f'DROP TABLE IF EXISTS temp.tmp_{name}')
+			fields = row_fields(value)
+			if fields:
+				dbapi_conn.execute(f"CREATE TEMP TABLE tmp_{name} ({', '.join(fields)})")
+				dbapi_conn.executemany(f"INSERT INTO temp.tmp_{name} VALUES ({', '.join('?' * len(fields))})",
+					list(dict.fromkeys(value)))
+				continue
+			dbapi_conn.execute(f'CREATE TEMP TABLE tmp_{name} (value PRIMARY KEY) WITHOUT ROWID')
+			dbapi_conn.executemany(f'INSERT OR IGNORE INTO temp.tmp_{name} VALUES (?)', [(v,) for v in value])
+	finally:
+		dbapi_conn.execute(f'PRAGMA query_only = {query_only}')
+	return {name: value for name, value in params.items() if name not in lists}
+
+
+def parquet_dir(db):
+	return st.secrets.get('duckdb', {}).get(db, {}).get('parquet_dir')
+
+
+@st.cache_resource
+def duckdb_connection(path):
+	"""In-memory DuckDB with one view per exported table; queries use their own cursor."""
+	con = duckdb.connect()
+	for name in sorted(os.listdir(path)):
+		full = os.path.join(path, name)
+		if os.path.isdir(full):
+			con.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{full}/**/*.parquet', "
+				f"hive_partitioning = true, hive_types = {HIVE_TYPES})")
+		elif name.endswith('.parquet'):
+			con.execute(f"CREATE VIEW {name[:-len('.parquet')]} AS SELECT * FROM read_parquet('{full}')")
+	return con
+
+
+def duckdb_version(path):
+	"""(mtime, version) of the export, as query.cache.db_version does for SQLite."""
+	version_file = os.path.join(path, 'db_version.parquet')
+	if not os.path.exists(version_file):
+		return None, None
+	# own cursor: the module-level duckdb.sql connection is not safe across the federated search threads
+	cursor = duckdb_connection(path).cursor()
+	try:
+		version = cursor.execute(f"SELECT MAX(version) FROM read_parquet('{version_file}')").fetchone()[0]
+	finally:
+		cursor.close()
+	return os.path.getmtime(version_file), version
+
+
+def table_columns(db, table):
+	"""Column names of a table, from whichever backend serves the dataset; [] when it does not exist."""
+	path = parquet_dir(db)
+	if path is not None:
+		cursor = duckdb_connection(path).cursor()
+		try:
+			return [row[0] for row in cursor.execute(f'DESCRIBE {table}').fetchall()]
+		except duckdb.CatalogException:
+			return []
+		finally:
+			cursor.close()
+	with get_engine(db).connect() as conn:
+		return [row[1] for row in conn.execute(text(f'PRAGMA table_info({table})'))]
+
+
+def duckdb_params(cursor, param):
+	"""Register list params as tmp_{name} views on the cursor; returns the scalar params."""
+	scalars = {}
+	for name, value in param.items():
+		if isinstance(value, (list, tuple)):
+			rows = list(dict.fromkeys(value))
+			frame = pd.DataFrame(rows, columns=row_fields(value)) if row_fields(value) else pd.DataFrame({'value': rows})
+			cursor.register(f'tmp_{name}', frame)
+		else:
+			# keyset values taken from a result row are numpy scalars, which DuckDB does not bind
+			scalars[name] = value.item() if isinstance(value, np.generic) else value
+	return scalars
+
+
+def duckdb_read(qry, param, path):
+	cursor = duckdb_connection(path).cursor()
+	try:
+		return cursor.execute(PLACEHOLDER.sub(r'$\1', qry), duckdb_params(cursor, param)).df()
+	finally:
+		cursor.close()
+
+
+def duckdb_batches(qry, param, path, batch_rows):
+	"""duckdb_read in DataFrames of batch_rows, pulled from the cursor as they are consumed."""
+	cursor = duckdb_connection(path).cursor()
+	try:
+		reader = cursor.execute(PLACEHOLDER.sub(r'$\1', qry), duckdb_params(cursor, param)).fetch_record_batch(batch_rows)
+		for batch in reader:
+			yield batch.to_pandas()
+	finally:
+		cursor.close()
+
+
+def duckdb_explain(qry, param, path):
+	cursor = duckdb_connection(path).cursor()
+	try:
+		rows = cursor.execute('EXPLAIN ' + PLACEHOLDER.sub(r'$\1', qry), duckdb_params(cursor, param)).fetchall()
+		return '\n'.join(row[1] for row in rows)
+	finally:
+		cursor.close()
@@ -0,0 +1,65 @@
+"""
+Batch lookup of an uploaded list of calls: one UUID per line, or BEDPE rows
+(chrom1 start1 end1 chrom2 start2 end2 [name score strand1 strand2 SV_TYPE ...], as
+written by the BEDPE export). The list becomes a temp table (query.backend) and every
+entry is resolved in one join against the call table, each row probing the
+(chrom1, pos1, UUID) index once.
+"""
+from collections import namedtuple
+from query.search_filters import list_table
+
+BATCH_MAX_ROWS = 100_000
+BedpeRow = namedtuple('BedpeRow', ['query', 'chrom1', 'start1', 'end1', 'chrom2', 'start2', 'end2', 'svtype'])
+
+
+def normalize_chrom(chrom):
+	# call tables store chromosomes without the chr prefix
+	chrom = chrom.strip()
+	return chrom[3:] if chrom.lower().startswith('chr') else chrom
+
+
+def parse_batch_file(content):
+	"""('uuid', [UUID, ...]) or ('bedpe', [BedpeRow, ...]) from the text of an uploaded file."""
+	lines = [line for line in content.splitlines() if line.strip() and not line.startswith(('#', 'track', 'browser'))]
+	if all(len(line.split()) == 1 for line in lines):
+		return 'uuid', list(dict.fromkeys(line.strip() for line in lines))
+	rows = []
+	for n, line in enumerate(lines, start=1):
+		fields = line.rstrip('\n').split('\t')
+		if len(fields) < 6:
+			raise ValueError(f'line {n}: expected 6 or more tab-separated BEDPE columns, got {len(fields)}')
+		try:
+			start1, end1, start2, end2 = (int(fields[i]) for i in (1, 2, 4, 5))
+		except ValueError:
+			raise ValueError(f'line {n}: BEDPE start/end columns must be integers')
+		name = fields[6] if len(fields) > 6 and fields[6] not in ('', '.') else f'row {n}'
+		svtype = fields[10] if len(fields) > 10 and fields[10] not in ('', '.') else None
+		rows.append(BedpeRow(name, normalize_chrom(fields[0]), start1, end1,
+			normalize_chrom(fields[3]), start2, end2, svtype))
+	return 'bedpe', rows
+
+
+def batch_build(kind, entries, tolerance, table, meta_join=True):
+	"""Calls matching every uploaded entry, the entry first in a `query` column."""
+	ref = table.split('_')[-1]
+	params = {'num_rows': BATCH_MAX_ROWS}
+	# sample sex/phenotype come from meta_{ref} unless the call table carries them (query.query.meta_joined)
+	meta_cols, meta_join_sql = ', m.sex, m.phenotype', f' JOIN meta_{ref} m ON p.pt_id = m.pt_id'
+	if not meta_join:
+		meta_cols, meta_join_sql = '', ''
+	if kind == 'uuid':
+		qry = (
+			f"SELECT t.value AS query, p.*{meta_cols} FROM {list_table('uuid', entries, params)} t"
+			f' CROSS JOIN {table} p{meta_join_sql} WHERE p.UUID = t.value'
+		)
+	else:
+		# BEDPE intervals are 0-based half-open around the 1-based pos; tolerance widens both sides
+		qry = (
+			f"SELECT t.query, p.*{meta_cols} FROM {list_table('bedpe', entries, params)} t"
+			f' CROSS JOIN {table} p{meta_join_sql}'
+			' WHERE p.chrom1 = t.chrom1 AND p.pos1 BETWEEN t.start1 + 1 - :tolerance AND t.end1 + :tolerance'
+			' AND p.chrom2 = t.chrom2 AND p.pos2 BETWEEN t.start2 + 1 - :tolerance AND t.end2 + :tolerance'
+			' AND (t.svtype IS NULL OR p.SV_TYPE = t.svtype)'
+		)
+		params['tolerance'] = int(tolerance)
+	return qry + ' ORDER BY query, p.chrom1, p.pos1, p.UUID LIMIT :num_rows', params
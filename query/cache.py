@@ -0,0 +1,91 @@
+import os
+import threading
+from collections import OrderedDict
+import streamlit as st
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Bounds of the process-wide result cache
+MAX_ENTRIES = 256
+MAX_BYTES = 1024 * 1024 * 1024
+
+
+def normalize_sql(qry):
+	return ' '.join(qry.split())
+
+
+def db_version(engine):
+	"""(mtime, version) of a SQLite DB; changes whenever helper/to_sqlite reloads it."""
+	path = engine.url.database
+	mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+	try:
+		with engine.connect() as conn:
+			version = conn.execute(text('SELECT MAX(version) FROM db_version')).scalar()
+	except OperationalError:
+		version = None
+	return mtime, version
+
+
+class QueryCache:
+	"""Size-bounded LRU of query results shared by every session of the app process.
+
+	Entries are keyed on (db, normalized SQL, params); the SQL names the table.
+	All entries of a db are dropped as soon as its (mtime, version) changes.
+	"""
+
+	def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+		self._versions = {}
+		self._nbytes = 0
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def make_key(db, qry, params):
+		return db, normalize_sql(qry), tuple(sorted((k, repr(v)) for k, v in params.items()))
+
+	def check_version(self, db, version):
+		with self._lock:
+			if self._versions.get(db) != version:
+				for key in [k for k in self._entries if k[0] == db]:
+					self._nbytes -= self._entries.pop(key)[1]
+				self._versions[db] = version
+
+	def get(self, key):
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return self._entries[key][0]
+			self.misses += 1
+			return None
+
+	def peek(self, key):
+		"""get() without moving the entry or counting a hit/miss, for lookups the user did not ask for."""
+		with self._lock:
+			entry = self._entries.get(key)
+			return None if entry is None else entry[0]
+
+	def put(self, key, df):
+		nbytes = int(df.memory_usage(index=True, deep=True).sum())
+		if nbytes > self.max_bytes:
+			return nbytes
+		with self._lock:
+			if key in self._entries:
+				self._nbytes -= self._entries.pop(key)[1]
+			self._entries[key] = (df, nbytes)
+			self._nbytes += nbytes
+			while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+				self._nbytes -= self._entries.popitem(last=False)[1][1]
+		return nbytes
+
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'MB': self._nbytes / 1024 ** 2}
+
+
+@st.cache_resource
+def get_query_cache():
+	return QueryCache()
@@ -0,0 +1,52 @@
+"""
+Read-only SQLite engines for the app, one per database, built from the [connections.<db>]
+url in .streamlit/secrets.toml with optional per-database tuning:
+
+	[sqlite.CLDB_SR]
+	mmap_size = 8589934592   # bytes of the file served from mapped pages (default 4 GiB)
+	cache_size = -1048576    # page cache; negative is KiB (default 1 GiB)
+	immutable = false        # skip locking and change checks; only for files never reloaded in place
+
+Connections open the file with mode=ro and set query_only, so the app cannot write to it;
+temp_store=MEMORY keeps sorts and the list-filter temp tables off disk.
+"""
+import os
+import sqlite3 as sq
+from urllib.parse import quote
+import streamlit as st
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+TUNED_PRAGMAS = {
+	'mmap_size': 4 * 1024 ** 3,
+	'cache_size': -1024 * 1024,
+	'temp_store': 'MEMORY',
+	'query_only': 'ON',
+}
+
+
+def read_only_uri(path, immutable=False):
+	uri = f'file:{quote(os.path.abspath(path))}?mode=ro'
+	return uri + '&immutable=1' if immutable else uri
+
+
+def connect_read_only(path, pragmas=TUNED_PRAGMAS, immutable=False):
+	conn = sq.connect(read_only_uri(path, immutable), uri=True, check_same_thread=False)
+	for name, value in pragmas.items():
+		conn.execute(f'PRAGMA {name} = {value}')
+	return conn
+
+
+def tuned_engine(path, pragmas=TUNED_PRAGMAS, immutable=False):
+	# the sqlite:/// url keeps the file path on engine.url (query.cache.db_version) and the file-DB pool
+	return create_engine(f'sqlite:///{path}', creator=lambda: connect_read_only(path, pragmas, immutable))
+
+
+@st.cache_resource
+def get_engine(db):
+	"""Shared read-only engine for a database named in secrets.toml."""
+	path = make_url(st.secrets['connections'][db]['url']).database
+	settings = dict(st.secrets.get('sqlite', {}).get(db, {}))
+	pragmas = dict(TUNED_PRAGMAS)
+	pragmas.update({name: settings[name] for name in ('mmap_size', 'cache_size') if name in settings})
+	return tuned_engine(path, pragmas, settings.get('immutable', False))
@@ -0,0 +1,130 @@
+"""
+Streaming export of a whole query result (every page) to gzip TSV, gzip BEDPE or Parquet.
+
+Rows come from a server-side cursor in EXPORT_BATCH_ROWS batches and are appended to the
+writer one batch at a time, so memory holds a single batch however many rows match.
+The file is written to the temp dir and handed to st.download_button; files older than
+EXPORT_MAX_AGE, left behind by sessions that ended, are swept by sweep_exports.
+"""
+import os
+import glob
+import gzip
+import time
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from query.backend import bind_list_params, parquet_dir, duckdb_batches
+from query.connection import get_engine
+
+EXPORT_BATCH_ROWS = 50_000
+EXPORT_PREFIX = 'cldb_export_'
+# seconds an export stays downloadable
+EXPORT_MAX_AGE = 2 * 3600
+# label -> file extension
+EXPORT_FORMATS = {'TSV (gzip)': 'tsv.gz', 'BEDPE (gzip)': 'bedpe.gz', 'Parquet': 'parquet'}
+BEDPE_COLUMNS = ['chrom1', 'start1', 'end1', 'chrom2', 'start2', 'end2', 'name', 'score', 'strand1', 'strand2']
+
+
+def sqlite_batches(engine, qry, params, batch_rows):
+	# yield_per makes SQLAlchemy fetchmany() from the live cursor instead of buffering the result
+	with engine.connect().execution_options(yield_per=batch_rows) as conn:
+		result = conn.execute(text(qry), bind_list_params(conn.connection.driver_connection, params))
+		columns = list(result.keys())
+		for rows in result.partitions():
+			yield pd.DataFrame(rows, columns=columns)
+
+
+def query_batches(qry, param, db, batch_rows=EXPORT_BATCH_ROWS):
+	path = parquet_dir(db)
+	if path is not None:
+		return duckdb_batches(qry, param, path, batch_rows)
+	return sqlite_batches(get_engine(db), qry, param, batch_rows)
+
+
+def to_bedpe(df, name_col):
+	# one-base breakpoint intervals (pos is 1-based), then SV type and sample when present
+	bedpe = pd.DataFrame({
+		'chrom1': df['chrom1'], 'start1': df['pos1'] - 1, 'end1': df['pos1'],
+		'chrom2': df['chrom2'], 'start2': df['pos2'] - 1, 'end2': df['pos2'],
+		'name': df[name_col], 'score': '.', 'strand1': '.', 'strand2': '.'})
+	for col in ['SV_TYPE', 'PT_ID']:
+		if col in df.columns:
+			bedpe[col] = df[col]
+	return bedpe
+
+
+class ParquetExport:
+	"""Appends batches to one Parquet file as row groups; the schema is fixed by the first batch."""
+
+	def __init__(self, path):
+		self.path = path
+		self.writer = None
+		self.text_columns = []
+
+	def write(self, df):
+		if self.writer is None:
+			schema = pa.Schema.from_pandas(df, preserve_index=False)
+			# columns that are all NULL in the first batch have no type yet; keep them as text
+			self.text_columns = [f.name for f in schema if pa.types.is_null(f.type)]
+			for name in self.text_columns:
+				schema = schema.set(schema.get_field_index(name), pa.field(name, pa.string()))
+			self.writer = pq.ParquetWriter(self.path, schema, compression='zstd')
+		df = df.astype({name: 'string' for name in self.text_columns})
+		self.writer.write_table(pa.Table.from_pandas(df, schema=self.writer.schema, preserve_index=False))
+
+	def close(self):
+		if self.writer is not None:
+			self.writer.close()
+
+
+def write_export(batches, fmt, path, name_col):
+	"""Stream batches into path in the given EXPORT_FORMATS extension; returns the row count."""
+	rows = 0
+	if fmt == 'parquet':
+		out = ParquetExport(path)
+		try:
+			for df in batches:
+				out.write(df)
+				rows += len(df.index)
+		finally:
+			out.close()
+		return rows
+
+	with gzip.open(path, 'wt', compresslevel=6) as f:
+		for i, df in enumerate(batches):
+			if fmt == 'bedpe.gz':
+				df = to_bedpe(df, name_col)
+				if i == 0:
+					f.write('#')
+			df.to_csv(f, sep='\t', index=False, header=i == 0)
+			rows += len(df.index)
+	return rows
+
+
+def export_query(qry, param, db, fmt, name_col):
+	"""Run qry without paging into a temp file; (path, rows)."""
+	fd, path = tempfile.mkstemp(suffix=f'.{fmt}', prefix=EXPORT_PREFIX)
+	os.close(fd)
+	try:
+		rows = write_export(query_batches(qry, param, db), fmt, path, name_col)
+	except Exception:
+		os.remove(path)
+		raise
+	return path, rows
+
+
+def sweep_exports(max_age=EXPORT_MAX_AGE):
+	"""Remove exports in the temp dir older than max_age seconds; returns how many."""
+	cutoff = time.time() - max_age
+	removed = 0
+	for path in glob.glob(os.path.join(tempfile.gettempdir(), f'{EXPORT_PREFIX}*')):
+		try:
+			if os.path.getmtime(path) < cutoff:
+				os.remove(path)
+				removed += 1
+		except FileNotFoundError:
+			# swept by another session in the meantime
+			pass
+	return removed
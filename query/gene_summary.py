@@ -0,0 +1,51 @@
+"""
+Cohort-level gene counts from gene_counts_{table} and sample_counts_{table}, which
+helper/to_sqlite aggregates at load time from the gene child table: calls and distinct
+carriers per gene, SV_TYPE and proband status, so a gene summary is an index lookup
+instead of a pull of every call.
+"""
+import pandas as pd
+from query.search_filters import list_filter
+
+
+def gene_counts_build(genes, table):
+	params = {}
+	qry = (
+		f'SELECT gene_symbol, SV_TYPE, IS_PROBAND, n_calls, n_carriers FROM gene_counts_{table} '
+		f"WHERE gene_symbol IN {list_filter('gene_summary', [g.strip().upper() for g in genes], params)} "
+		'ORDER BY gene_symbol, SV_TYPE, IS_PROBAND'
+	)
+	return qry, params
+
+
+def gene_list_build(table):
+	return f'SELECT DISTINCT gene_symbol FROM gene_counts_{table} ORDER BY gene_symbol', {}
+
+
+def sample_counts_build(table):
+	return f'SELECT IS_PROBAND, n_samples FROM sample_counts_{table}', {}
+
+
+def proband_status(is_proband):
+	# IS_PROBAND is 1/0; anything else (NULL) is left out of the summary
+	return pd.to_numeric(is_proband, errors='coerce').map({1: 'proband', 0: 'nonproband'})
+
+
+def summarize(counts, samples):
+	"""One row per gene and SV_TYPE: proband and non-proband carriers, as counts and cohort fractions."""
+	columns = ['gene_symbol', 'SV_TYPE', 'proband_carriers', 'proband_pct', 'nonproband_carriers',
+		'nonproband_pct', 'proband_calls', 'nonproband_calls']
+	if counts.empty:
+		return pd.DataFrame(columns=columns)
+	counts = counts.assign(status=proband_status(counts['IS_PROBAND'])).dropna(subset=['status'])
+	wide = counts.pivot_table(index=['gene_symbol', 'SV_TYPE'], columns='status',
+		values=['n_carriers', 'n_calls'], aggfunc='sum', fill_value=0)
+	totals = samples.assign(status=proband_status(samples['IS_PROBAND'])).groupby('status')['n_samples'].sum()
+	out = pd.DataFrame(index=wide.index)
+	for status in ['proband', 'nonproband']:
+		carriers = wide[('n_carriers', status)] if ('n_carriers', status) in wide.columns else 0
+		out[f'{status}_carriers'] = carriers
+		n = totals.get(status, 0)
+		out[f'{status}_pct'] = (100 * out[f'{status}_carriers'] / n).round(2) if n else float('nan')
+		out[f'{status}_calls'] = wide[('n_calls', status)] if ('n_calls', status) in wide.columns else 0
+	return out.reset_index()[columns]
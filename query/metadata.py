@@ -0,0 +1,47 @@
+"""
+Sample metadata registry. Each /CLDB/meta TSV is parsed once per process and shared by
+every page, tab and rerun; it is re-read only when the file's mtime changes, so an
+edited sheet shows up without restarting the app. Returned frames are shared: filter
+or copy them, never modify them in place.
+"""
+import os
+import threading
+import pandas as pd
+
+META_DIR = '/CLDB/meta'
+
+_registry = {}  # path -> (mtime, frame, frame indexed by pt_id)
+_lock = threading.Lock()
+
+
+def meta_path(db, ref=None):
+	if db == 'CLDB_LR':
+		return f'{META_DIR}/meta_LR.tsv'
+	if db == 'GREGoR_SR':
+		return f'{META_DIR}/gregor_meta.tsv'
+	return f'{META_DIR}/meta_SR_{ref}.tsv'
+
+
+def _load(path):
+	mtime = os.path.getmtime(path)
+	with _lock:
+		entry = _registry.get(path)
+		if entry is None or entry[0] != mtime:
+			frame = pd.read_csv(path, sep='\t', index_col=False)
+			by_pt = frame.set_index('pt_id', drop=False)
+			entry = (mtime, frame, by_pt[~by_pt.index.duplicated()])
+			_registry[path] = entry
+	return entry
+
+
+def sample_metadata(db, ref=None):
+	"""Every sample of a dataset (ref picks the CLDB_SR build)."""
+	return _load(meta_path(db, ref))[1]
+
+
+def sample_record(db, ref, pt_id):
+	"""Metadata row of one sample as a Series, or None when the sample is not listed."""
+	by_pt = _load(meta_path(db, ref))[2]
+	if pt_id not in by_pt.index:
+		return None
+	return by_pt.loc[pt_id]
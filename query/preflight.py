@@ -0,0 +1,83 @@
+"""
+Preflight estimate of how many rows a Query click will match, shown next to the button.
+
+SQLite: the COUNT(*) of count_build runs with a small time budget; when it does not
+finish in time, the row count is estimated from sqlite_stat1 (table size times the
+average rows per key of each indexed equality filter). Range filters are left out, so
+the estimate is an upper bound. Thresholds come from .streamlit/secrets.toml:
+
+	[preflight]
+	warn_rows = 1000000     # warn next to the Query button above this
+	block_rows = 20000000   # disable the Query button above this (unset: never)
+	time_budget = 0.5       # seconds the exact count may take
+"""
+import time
+import streamlit as st
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from query.backend import bind_list_params
+
+DEFAULTS = {'warn_rows': 1_000_000, 'block_rows': None, 'time_budget': 0.5}
+
+# qry_dict filters answered by an equality lookup on an indexed column
+EQUALITY_FILTERS = {
+	'chrom1': 'chrom1',
+	'svtype': 'SV_TYPE',
+	'pt_id': 'PT_ID',
+	'family': 'FAM_ID',
+	'project': 'PROJECT',
+	'cluster_id': 'CLUSTER_ID',
+	'is_proband': 'IS_PROBAND',
+	'sv_id': 'SV_ID',
+}
+
+
+def preflight_settings():
+	settings = dict(DEFAULTS)
+	settings.update(st.secrets.get('preflight', {}))
+	return settings
+
+
+def budgeted_count(engine, qry, params, budget):
+	"""COUNT(*) query result, or None when it runs past budget seconds."""
+	with engine.connect() as conn:
+		dbapi_conn = conn.connection.driver_connection
+		params = bind_list_params(dbapi_conn, params)
+		deadline = time.perf_counter() + budget
+		# SQLite calls the handler every 10k VM steps; a true return interrupts the statement
+		dbapi_conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+		try:
+			return int(conn.execute(text(qry), params).scalar())
+		except OperationalError as e:
+			if 'interrupted' not in str(e):
+				raise
+			return None
+		finally:
+			dbapi_conn.set_progress_handler(None, 0)
+
+
+def stat1_estimate(engine, table, qry_dict):
+	"""Upper-bound row estimate from sqlite_stat1, or None when the table was never analyzed."""
+	with engine.connect() as conn:
+		try:
+			stats = conn.execute(text('SELECT idx, stat FROM sqlite_stat1 WHERE tbl = :tbl'), {'tbl': table}).fetchall()
+		except OperationalError:
+			return None
+		if not stats:
+			return None
+		total = int(stats[0][1].split()[0])
+		# average rows per key of the first column of every index
+		rows_per_key = {}
+		for idx, stat in stats:
+			first = conn.execute(text(f'PRAGMA index_info({idx})')).fetchone()
+			if first is not None and len(stat.split()) > 1:
+				rows_per_key.setdefault(first[2], int(stat.split()[1]))
+
+	estimate = total
+	for name, col in EQUALITY_FILTERS.items():
+		value = qry_dict.get(name)
+		if value is None or value == [] or value == '' or col not in rows_per_key:
+			continue
+		n_keys = len(value) if isinstance(value, list) else 1
+		estimate = min(estimate, n_keys * rows_per_key[col])
+	return estimate
@@ -1,18 +1,222 @@
+import os
+import time
 import pandas as pd
 import numpy as np
 import streamlit as st
-from query.search_filters import search_filters, search_build, igv_filters, vizCNV_filters
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from sqlalchemy import text
+from query.cache import get_query_cache, db_version
+from query.connection import get_engine
+from query.backend import bind_list_params, parquet_dir, duckdb_version, duckdb_read, duckdb_explain, table_columns
+from query.preflight import preflight_settings, budgeted_count, stat1_estimate
+from query.export import EXPORT_FORMATS, EXPORT_MAX_AGE, export_query, sweep_exports
+from query.telemetry import telemetry_settings, explain_plan, record_query
+from query.metadata import sample_record
+from query.batch import BATCH_MAX_ROWS, parse_batch_file, batch_build
+from query.gene_summary import gene_counts_build, gene_list_build, sample_counts_build, summarize
+from query.search_filters import search_filters, federated_filters, search_build, count_build, export_build, \
+	cluster_build, cluster_count_build, cluster_export_build, score_build, score_export_build, igv_filters, vizCNV_filters, \
+	page_after, PAGE_KEY, CLUSTER_PAGE_KEY, SCORE_PAGE_KEY
 from helper.variant_snapshot import variant_snapshot, vizCNV
 import streamlit.components.v1 as components
 
-def query(qry, param, db):
-	conn = st.connection(db, type='sql')
-	df=conn.query(qry, params=param)
+def query(qry, param, db, label=None):
+	cache = get_query_cache()
+	# datasets with a parquet_dir in secrets are read through DuckDB, the rest from SQLite
+	path = parquet_dir(db)
+	if path is not None:
+		cache.check_version(db, duckdb_version(path))
+	else:
+		engine = get_engine(db)
+		cache.check_version(db, db_version(engine))
+	cache_key = cache.make_key(db, qry, param)
+	df = cache.get(cache_key)
+	if df is not None:
+		record_query(db, label, qry, param, 0.0, len(df.index), cached=True)
+		return df
+
+	explain = telemetry_settings()['explain']
+	plan = None
+	start = time.perf_counter()
+	if path is not None:
+		df = duckdb_read(qry, param, path)
+		seconds = time.perf_counter() - start
+		if explain:
+			plan = duckdb_explain(qry, param, path)
+	else:
+		with engine.connect() as c:
+			scalars = bind_list_params(c.connection.driver_connection, param)
+			df = pd.read_sql(text(qry), c, params=scalars)
+			seconds = time.perf_counter() - start
+			if explain:
+				plan = explain_plan(c, qry, scalars)
+	nbytes = cache.put(cache_key, df)
+	record_query(db, label, qry, param, seconds, len(df.index), nbytes, plan=plan)
 	return df   
 
+# (page builder, count builder, keyset, export builder) per query mode
+QUERY_MODES = {
+	'Calls': (search_build, count_build, PAGE_KEY, export_build),
+	'Clusters': (cluster_build, cluster_count_build, CLUSTER_PAGE_KEY, cluster_export_build),
+	'Top score': (score_build, count_build, SCORE_PAGE_KEY, score_export_build),
+}
+
+def fetch_page(qry_dict, table, db, after, mode='Calls'):
+	# copy: search_build rewrites rs_list/sv_id in place
+	qry, param = QUERY_MODES[mode][0](dict(qry_dict, after=after), table)
+	return query(qry, param, db, label=f'{table} {mode} page')
+
+def next_page(key, table, db):
+	mode = st.session_state[f'{key}_mode']
+	pages = st.session_state[f'{key}_pages']
+	pages.append(page_after(st.session_state[f'{key}_df'], QUERY_MODES[mode][2]))
+	st.session_state[f'{key}_df'] = fetch_page(st.session_state[f'{key}_qry_dict'], table, db, pages[-1], mode)
+
+def previous_page(key, table, db):
+	mode = st.session_state[f'{key}_mode']
+	pages = st.session_state[f'{key}_pages']
+	pages.pop()
+	st.session_state[f'{key}_df'] = fetch_page(st.session_state[f'{key}_qry_dict'], table, db, pages[-1], mode)
+
+def run_query(key, table, db, qry_dict, mode):
+	st.session_state[f'{key}_qry_dict'] = dict(qry_dict)
+	st.session_state[f'{key}_mode'] = mode
+	st.session_state[f'{key}_pages'] = [None]
+	st.session_state[f'{key}_count'] = None
+	st.session_state[f'{key}_df'] = fetch_page(qry_dict, table, db, None, mode)
+	st.session_state[f'{key}_displayed']=True
+
+def open_cluster(key, table, db, cluster_id):
+	# drill down from a cluster row to its calls, keeping the other filters of the last query
+	qry_dict = dict(st.session_state[f'{key}_qry_dict'], cluster_id=cluster_id)
+	run_query(key, table, db, qry_dict, 'Calls')
+
+@st.cache_resource(ttl=EXPORT_MAX_AGE)
+def sweep_stale_exports():
+	# runs at startup and then at most once per EXPORT_MAX_AGE, for exports of sessions that ended
+	return sweep_exports()
+
+def prepare_export(key, table, db, fmt):
+	mode = st.session_state[f'{key}_mode']
+	previous = st.session_state.get(f'{key}_export')
+	if previous is not None and os.path.exists(previous[0]):
+		os.remove(previous[0])
+	qry, param = QUERY_MODES[mode][3](dict(st.session_state[f'{key}_qry_dict']), table)
+	start = time.perf_counter()
+	path, rows = export_query(qry, param, db, fmt, QUERY_MODES[mode][2][-1])
+	record_query(db, f'{table} {mode} export', qry, param, time.perf_counter() - start, rows)
+	st.session_state[f'{key}_export'] = (path, rows, fmt)
+
+def preflight(key, table, db, qry_dict, mode):
+	"""Rows the query would match (exact, or an upper-bound estimate) and the seconds the count took."""
+	cqry, cparam = QUERY_MODES[mode][1](dict(qry_dict), table)
+	cache = get_query_cache()
+	cache_key = cache.make_key(db, cqry, cparam)
+	# every tab renders on each rerun; only count when this tab's filters changed
+	previous = st.session_state.get(f'{key}_preflight')
+	if previous is not None and previous[0] == cache_key:
+		return previous[1]
+
+	path = parquet_dir(db)
+	engine = get_engine(db) if path is None else None
+	stat_table = f'clusters_{table}' if mode == 'Clusters' else table
+	if previous is None:
+		# first render of the tab: index statistics only, so opening the page runs no counts
+		rows = stat1_estimate(engine, stat_table, qry_dict) if engine is not None else None
+		result = {'rows': rows, 'exact': False, 'seconds': None, 'deferred': True}
+		st.session_state[f'{key}_preflight'] = (cache_key, result)
+		return result
+
+	start = time.perf_counter()
+	cache.check_version(db, duckdb_version(path) if path is not None else db_version(engine))
+	# peek: preflight lookups stay out of the result cache hit/miss statistics
+	cached = cache.peek(cache_key)
+	if cached is not None:
+		n = int(cached['n'].iloc[0])
+	else:
+		if path is not None:
+			# a columnar count is cheap enough to run in full
+			n = int(duckdb_read(cqry, cparam, path)['n'].iloc[0])
+		else:
+			n = budgeted_count(engine, cqry, cparam, preflight_settings()['time_budget'])
+		record_query(db, f'{table} {mode} preflight', cqry, cparam, time.perf_counter() - start, n)
+		if n is not None:
+			# the count shown after the first page reads it back from the cache
+			cache.put(cache_key, pd.DataFrame({'n': [n]}))
+	if n is not None:
+		result = {'rows': n, 'exact': True, 'seconds': time.perf_counter() - start, 'deferred': False}
+	else:
+		result = {'rows': stat1_estimate(engine, stat_table, qry_dict), 'exact': False, 'seconds': None, 'deferred': False}
+	st.session_state[f'{key}_preflight'] = (cache_key, result)
+	return result
+
+def preflight_caption(result):
+	if result['exact']:
+		return f"{result['rows']:,} matching rows (counted in {result['seconds']:.2f}s)"
+	if result['deferred']:
+		if result['rows'] is None:
+			return 'Matching rows are counted once the filters change'
+		return f"Up to ~{result['rows']:,} matching rows (index statistics; counted once the filters change)"
+	budget = preflight_settings()['time_budget']
+	if result['rows'] is None:
+		return f'Row count unknown: counting takes over {budget}s'
+	return f"Up to ~{result['rows']:,} matching rows (index statistics; counting takes over {budget}s)"
+
+@st.cache_resource
+def cached_table_columns(db, table, version):
+	# version is only part of the cache key, so a reloaded DB is described again
+	return table_columns(db, table)
+
+def has_columns(db, table, columns):
+	path = parquet_dir(db)
+	version = duckdb_version(path) if path is not None else db_version(get_engine(db))
+	return set(columns) <= set(cached_table_columns(db, table, version))
+
+def meta_joined(db, table):
+	"""False when helper/to_sqlite denormalized sex/phenotype into the call table, so searches skip meta_{ref}."""
+	return not has_columns(db, table, ['sex', 'phenotype'])
+
+def batch_lookup(key, table, db):
+	upload = st.file_uploader('UUID list or BEDPE file', type=['txt', 'tsv', 'bedpe'], key=f'batch-file-{key}',
+		help='one UUID per line, or BEDPE rows (chrom1, start1, end1, chrom2, start2, end2, name, score, '
+			'strand1, strand2, SV_TYPE); name and SV_TYPE are optional')
+	tolerance = st.number_input('Breakpoint tolerance (bp):', min_value=0, value=0, step=50, key=f'batch-tol-{key}',
+		help='BEDPE only: how far each breakpoint may fall outside its interval')
+	if upload is None:
+		return
+	try:
+		kind, entries = parse_batch_file(upload.getvalue().decode('utf-8', errors='replace'))
+	except ValueError as e:
+		st.error(f'Cannot read {upload.name}: {e}')
+		return
+	if not entries:
+		st.warning(f'{upload.name} has no UUIDs or BEDPE rows')
+		return
+	if st.button(f'Look up {len(entries):,} {"UUIDs" if kind == "uuid" else "BEDPE rows"}', key=f'batch-btn-{key}'):
+		qry, param = batch_build(kind, entries, tolerance, table, meta_joined(db, table))
+		st.session_state[f'{key}_batch'] = (len(entries), query(qry, param, db, label=f'{table} batch {kind}'))
+	if st.session_state.get(f'{key}_batch') is not None:
+		n_entries, df = st.session_state[f'{key}_batch']
+		st.write(f"{len(df.index):,} calls match {df['query'].nunique():,} of {n_entries:,} entries")
+		if len(df.index) == BATCH_MAX_ROWS:
+			st.warning(f'Showing the first {BATCH_MAX_ROWS:,} matches; lower the tolerance or split the file')
+		st.dataframe(df, hide_index=True, height=400)
+
+def gene_summary(key, table, db):
+	genes = st.multiselect('Genes:', query(*gene_list_build(table), db, label=f'{table} gene list')['gene_symbol'],
+		key=f'gene-summary-{key}', help='carriers counted from the whole table at load time; query filters do not apply')
+	if not genes:
+		return
+	counts = query(*gene_counts_build(genes, table), db, label=f'{table} gene summary')
+	samples = query(*sample_counts_build(table), db, label=f'{table} sample counts')
+	st.caption('pct: carriers as a percentage of all probands / non-probands in the table')
+	st.dataframe(summarize(counts, samples), hide_index=True)
+
 def final_query(dataset, pipeline, ref, db):
 	key=dataset+'_'+pipeline+'_'+ref
 	table=pipeline+'_'+ref
+	sweep_stale_exports()
 	
 	if f'{key}_df' not in st.session_state:
 		st.session_state[f'{key}_df'] = None
@@ -20,21 +224,102 @@ def final_query(dataset, pipeline, ref, db):
 	if f'{key}_displayed' not in st.session_state:
 		st.session_state[f'{key}_displayed'] = None
 
-	qry_dict=search_filters(db, key)
-	qry, param=search_build(qry_dict, table)
-	# st.write(qry) #debug
-	if st.button('Query', type='primary', key=f'qry-btn-{key}'):
-		df=query(qry, param, db)
-		st.session_state[f'{key}_df'] = df	
-		st.session_state[f'{key}_displayed']=True
+	# filters of the last Query click, the page start keys walked so far and the total count
+	if f'{key}_qry_dict' not in st.session_state:
+		st.session_state[f'{key}_qry_dict'] = None
+		st.session_state[f'{key}_mode'] = 'Calls'
+		st.session_state[f'{key}_pages'] = [None]
+		st.session_state[f'{key}_count'] = None
+
+	with st.expander('Batch lookup from file'):
+		batch_lookup(key, table, db)
+	if has_columns(db, f'gene_counts_{table}', ['gene_symbol']):
+		with st.expander('Gene summary'):
+			gene_summary(key, table, db)
+
+	qry_dict=search_filters(db, key, cluster_assoc=has_columns(db, f'clusters_{table}', ['assoc_pvalue']))
+	qry_dict['meta_join'] = meta_joined(db, table)
+	# tables loaded before helper/priority_score have no score to rank on
+	modes = [m for m in QUERY_MODES if m != 'Top score' or has_columns(db, table, ['priority_score'])]
+	mode = st.radio('Query mode:', modes, 
+		horizontal=True,
+		help='Clusters: one row per CLUSTER_ID with consensus coordinates, counts and frequencies; '
+			'fastest for count/frequency filters. Open a cluster to list its calls. '
+			'Top score: calls ranked by priority_score (rarity, OMIM/dosage genes, DECIPHER, proband propensity), '
+			'best first, one page of the selected number of rows at a time.',
+		key=f'mode-{key}')
+	# st.write(search_build(dict(qry_dict), table)) #debug
+	settings = preflight_settings()
+	estimate = preflight(key, table, db, qry_dict, mode)
+	rows = estimate['rows']
+	blocked = settings['block_rows'] is not None and rows is not None and rows > settings['block_rows']
+	col1, col2 = st.columns([1, 5])
+	with col1:
+		clicked = st.button('Query', type='primary', key=f'qry-btn-{key}', disabled=blocked)
+	with col2:
+		st.caption(preflight_caption(estimate))
+		if blocked:
+			st.error(f"Over {settings['block_rows']:,} rows; narrow the filters to run this query")
+		elif rows is not None and rows > settings['warn_rows']:
+			st.warning(f"Over {settings['warn_rows']:,} rows; counting and paging through them will be slow")
+	if clicked:
+		run_query(key, table, db, qry_dict, mode)
 
 	if st.session_state[f'{key}_displayed']:
 		st.markdown("""---""")
-		st.write(f'{len(st.session_state[f"{key}_df"].index)} results')
+		page_size = st.session_state[f'{key}_qry_dict']['num_rows']
+		pages = st.session_state[f'{key}_pages']
+		count_slot = st.empty()
+		col1, col2, _ = st.columns([1, 1, 6])
+		with col1:
+			st.button('Previous page', key=f'prev-page-btn-{key}', 
+				disabled=len(pages) == 1,
+				on_click=previous_page, args=(key, table, db))
+		with col2:
+			st.button('Next page', key=f'next-page-btn-{key}', 
+				disabled=len(st.session_state[f'{key}_df'].index) < page_size,
+				on_click=next_page, args=(key, table, db))
 		st.dataframe(st.session_state[f'{key}_df'], hide_index=False, height=600)
 
+		# count after the first page is on screen
+		if st.session_state[f'{key}_count'] is None:
+			cqry, cparam = QUERY_MODES[st.session_state[f'{key}_mode']][1](dict(st.session_state[f'{key}_qry_dict']), table)
+			label = f"{table} {st.session_state[f'{key}_mode']} count"
+			st.session_state[f'{key}_count'] = int(query(cqry, cparam, db, label=label)['n'].iloc[0])
+		n = st.session_state[f'{key}_count']
+		count_slot.write(f'{n} results (page {len(pages)} of {max(1, -(-n // page_size))})')
+		stats = get_query_cache().stats()
+		st.caption(f"Result cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries ({stats['MB']:.0f} MB)")
+
+		with st.expander('Export all results'):
+			col1, col2 = st.columns([1, 3])
+			with col1:
+				export_format = st.selectbox('Format:', list(EXPORT_FORMATS), key=f'export-format-{key}')
+				st.button('Prepare export', key=f'export-btn-{key}',
+					help='Writes every matching row, not just this page, in batches on the server',
+					on_click=prepare_export, args=(key, table, db, EXPORT_FORMATS[export_format]))
+			with col2:
+				export = st.session_state.get(f'{key}_export')
+				if export is not None and os.path.exists(export[0]):
+					path, rows, fmt = export
+					with open(path, 'rb') as f:
+						st.download_button(f'Download {rows:,} rows ({fmt})', f, 
+							file_name=f'{key}.{fmt}', key=f'export-download-{key}')
+
+	if st.session_state[f'{key}_displayed'] and st.session_state[f'{key}_mode'] == 'Clusters':
+		st.markdown("""---""")
+		col1, col2 = st.columns(2)
+		with col1:
+			cluster_id=st.selectbox('Select Cluster ID', 
+				st.session_state[f'{key}_df'].CLUSTER_ID.tolist(),
+				index=None, 
+				key=f'open-cluster-{key}')
+		with col2:
+			st.button('Show calls in cluster', key=f'open-cluster-btn-{key}',
+				disabled=cluster_id is None,
+				on_click=open_cluster, args=(key, table, db, cluster_id))
 	
-	if st.session_state[f'{key}_displayed'] and 'CGR' not in key:
+	if st.session_state[f'{key}_displayed'] and st.session_state[f'{key}_mode'] != 'Clusters' and 'CGR' not in key:
 		st.markdown("""---""")
 		uuids=st.session_state[f'{key}_df'].UUID.unique()
 		col1, col2 = st.columns(2)
@@ -57,28 +342,87 @@ def final_query(dataset, pipeline, ref, db):
 				st.write('Please select UUID')
 
 
+# (dataset, pipeline, ref, db) of every final_query tab on the Query page
+FEDERATED_SOURCES = [
+	('cldb', 'P2', 'hg19', 'CLDB_SR'),
+	('cldb', 'CNV', 'hg19', 'CLDB_SR'),
+	('cldb', 'CGR', 'hg19', 'CLDB_SR'),
+	('cldb', 'P2', 'hg38', 'CLDB_SR'),
+	('cldb', 'CNV', 'hg38', 'CLDB_SR'),
+	('cldb', 'CGR', 'hg38', 'CLDB_SR'),
+	('gregor', 'P2', 'hg38', 'GREGoR_SR'),
+	('gregor', 'CNV', 'hg38', 'GREGoR_SR'),
+	('gregor', 'CGR', 'hg38', 'GREGoR_SR'),
+	('cldb', 'snf2', 'hg19', 'CLDB_LR'),
+	('cldb', 'snf2', 'hg38', 'CLDB_LR'),
+]
+
+def timed_query(qry_dict, pipeline, ref, db):
+	start = time.perf_counter()
+	try:
+		qry_dict = dict(qry_dict, meta_join=meta_joined(db, pipeline+'_'+ref))
+		qry, param = search_build(qry_dict, pipeline+'_'+ref)
+		df, error = query(qry, param, db, label=f'{pipeline}_{ref} federated'), None
+	except Exception as e:
+		df, error = None, str(e)
+	return df, time.perf_counter() - start, error
+
+def federated_query(qry_dict, sources=FEDERATED_SOURCES):
+	"""First page of search_build on every source at once; merged rows and per-source timing."""
+	# worker threads share the session's script context so st.secrets and the cached engines work in them
+	ctx = get_script_run_ctx()
+	with ThreadPoolExecutor(max_workers=len(sources), initializer=add_script_run_ctx, initargs=(None, ctx)) as pool:
+		futures = [pool.submit(timed_query, qry_dict, pipeline, ref, db) for _, pipeline, ref, db in sources]
+		results = [f.result() for f in futures]
+
+	frames, timing = [], []
+	for (dataset, pipeline, ref, db), (df, seconds, error) in zip(sources, results):
+		source = f'{dataset} {pipeline} {ref}'
+		if df is not None:
+			frames.append(df.assign(dataset=source)[['dataset'] + list(df.columns)])
+		timing.append({'dataset': source, 'rows': None if df is None else len(df.index),
+			'seconds': round(seconds, 3), 'error': error})
+	merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+	return merged, pd.DataFrame(timing)
+
+def federated_search():
+	key='federated'
+	if f'{key}_df' not in st.session_state:
+		st.session_state[f'{key}_df'] = None
+		st.session_state[f'{key}_timing'] = None
+		st.session_state[f'{key}_seconds'] = None
+
+	qry_dict=federated_filters(key)
+	if st.button('Query all datasets', type='primary', key=f'qry-btn-{key}'):
+		start = time.perf_counter()
+		st.session_state[f'{key}_df'], st.session_state[f'{key}_timing'] = federated_query(qry_dict)
+		st.session_state[f'{key}_seconds'] = time.perf_counter() - start
+
+	if st.session_state[f'{key}_df'] is not None:
+		st.markdown("""---""")
+		df = st.session_state[f'{key}_df']
+		timing = st.session_state[f'{key}_timing']
+		st.write(f"{len(df.index)} results from {timing['rows'].notnull().sum()} of {len(timing.index)} datasets "
+			f"in {st.session_state[f'{key}_seconds']:.2f}s (slowest dataset {timing['seconds'].max():.2f}s)")
+		st.dataframe(df, hide_index=True, height=600)
+		with st.expander('Per-dataset timing'):
+			st.dataframe(timing, hide_index=True)
+
+
 def igv_query(dataset, pipeline, ref, db):
 	key=dataset+'_'+pipeline+'_'+ref
 	table=pipeline+'_'+ref
 
 	pt_id = igv_filters(db, key)
 	if pt_id:
+		meta = sample_record(db, ref, pt_id)
 		if 'SR' in db:
-			if db == 'CLDB_SR' and 'hg19' in key: 
-				meta = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t', index_col=False)
-			elif db == 'CLDB_SR' and 'hg38' in key: 
-				meta = pd.read_csv('/CLDB/meta/meta_SR_hg38.tsv', sep='\t', index_col=False)
-			elif db == 'GREGoR_SR': 
-				meta = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t', index_col=False)
-			meta = meta[meta['pt_id'] == pt_id]
-			bam_path = meta['BAM_path'].squeeze()
+			bam_path = meta['BAM_path']
 		if db == 'CLDB_LR':
-			meta = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t', index_col=False)
-			meta = meta[meta['pt_id'] == pt_id]
 			if ref == 'hg19':
-				bam_path = meta['BAM_path_hg19'].squeeze()
+				bam_path = meta['BAM_path_hg19']
 			elif ref == 'hg38':
-				bam_path = meta['BAM_path_hg38'].squeeze()
+				bam_path = meta['BAM_path_hg38']
 
 		bam_ext = bam_path.split('.')[-1]
 		if bam_ext == 'bam':
@@ -148,17 +492,11 @@ def vizCNV_query(dataset, pipeline, ref, db):
 	chrom1, start, end, pt_id = vizCNV_filters(db, key)
 
 	if st.button('Generate vizCNV image (~15-30sec)', key=f'vizCNV-btn-{key}'):
-		if db == 'CLDB_SR' and 'hg19' in key: 
-			meta = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t', index_col=False)
-		elif db == 'CLDB_SR' and 'hg38' in key: 
-			meta = pd.read_csv('/CLDB/meta/meta_SR_hg38.tsv', sep='\t', index_col=False)
-		elif db == 'GREGoR_SR': 
-			meta = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t', index_col=False)
-		meta = meta[meta['pt_id'] == pt_id]
-		P2_path = meta['P2_path'].squeeze()
-		MD_path = meta['MD_path'].squeeze()
-		GATK_path = meta['GATK_path'].squeeze()
-		is_trio = meta['is_trio'].squeeze()
+		meta = sample_record(db, ref, pt_id)
+		P2_path = meta['P2_path']
+		MD_path = meta['MD_path']
+		GATK_path = meta['GATK_path']
+		is_trio = meta['is_trio']
 		pr_par2 = P2_path.split(':')[1]
 		pr_df = MD_path.split(':')[1]
 		pr_seg = pr_df.replace('.regions.bed.gz', '_SLM_segments.tsv')
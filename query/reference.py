@@ -0,0 +1,35 @@
+"""
+Reference annotations behind the search filters: the HPO term -> gene index and the OMIM /
+RefSeq gene symbol lists of each genome build. Each is read from REFERENCE_DIR the first
+time a filter needs it and then shared by every session, so a page opens without parsing
+files it does not use.
+"""
+import pandas as pd
+import streamlit as st
+
+REFERENCE_DIR = '/CLDB/util/BEDanno/reference'
+
+
+@st.cache_resource
+def hpo_gene_index():
+	"""gene_symbol Series indexed by sorted hpo_id, parsed once per process from phenotype_to_genes.txt."""
+	hpo = pd.read_csv(f'{REFERENCE_DIR}/phenotype_to_genes.txt', sep='\t', 
+		usecols=['hpo_id', 'gene_symbol'], dtype='category')
+	hpo = hpo.drop_duplicates().set_index('hpo_id')['gene_symbol']
+	return hpo.sort_index()
+
+
+# gene symbol column of each annotation BED under {REFERENCE_DIR}/{ref}/
+GENE_BEDS = {
+	'OMIM': ('OMIM_sorted.bed', ['chrom', 'start', 'end', 'gene_symbol', 'disease', 'pheno_key'], 'gene_symbol'),
+	'RefSeq': ('RefSeq_sorted.bed', ['chrom', 'start', 'end', 'gene_id'], 'gene_id'),
+}
+
+
+@st.cache_resource
+def gene_symbols(ref, source):
+	"""Unique gene symbols of the OMIM or RefSeq BED of one genome build, as a Categorical; parsed on first use."""
+	file_name, names, col = GENE_BEDS[source]
+	genes = pd.read_csv(f'{REFERENCE_DIR}/{ref}/{file_name}', sep='\t', index_col=False, header=0,
+		names=names, usecols=[col], dtype='category')
+	return genes[col].unique()
@@ -1,40 +1,35 @@
+import math
 import streamlit as st
 import pandas as pd
 import numpy as np
-
-def pheno2gene(hpo_id):
-	hpo = pd.read_csv('/CLDB/util/BEDanno/reference/phenotype_to_genes.txt', sep='\t')
-	genes=[]
-	out=hpo[hpo['hpo_id']==hpo_id]['gene_symbol'].unique().tolist()
-	return out
+from helper.binning import overlapping_bin_ranges
+from query.reference import hpo_gene_index, gene_symbols
+from query.backend import parquet_dir
+from query.metadata import sample_metadata
+
+def pheno2gene(hpo_ids):
+	# one lookup on the preloaded index for the whole term list
+	hpo = hpo_gene_index()
+	return hpo.loc[hpo.index.intersection(hpo_ids)].unique().tolist()
 	
 chrom = [i for i in range(1,23)]
 chrom.append('X')
 chrom.append('Y')
 
-OMIM=pd.read_csv('/CLDB/util/BEDanno/reference/hg19/OMIM_sorted.bed', sep='\t', \
-		index_col=False, header=0, names = ['chrom', 'start', 'end', 'gene_symbol', 'disease', 'pheno_key'])
-OMIM_syms = OMIM.gene_symbol.unique()
-OMIM = OMIM[OMIM.pheno_key.notnull()]
-rs=pd.read_csv('/CLDB/util/BEDanno/reference/hg19/RefSeq_sorted.bed', sep='\t', \
-		index_col=False, header=0, names= ['chrom', 'start', 'end', 'gene_id'])
-rs_syms = rs.gene_id.unique()
+
+def key_ref(key):
+	# genome build of a dataset tab key such as CLDB_P2_hg19
+	return 'hg38' if 'hg38' in key else 'hg19'
 
 
-def search_filters(db, key):
+def search_filters(db, key, cluster_assoc=False):
+	metadata = sample_metadata(db, key_ref(key))
 	if db == 'CLDB_LR':
-		metadata = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t', index_col=False)
 		if 'hg19' in key: 
 			metadata=metadata[metadata['hg19_path'].notnull()]
 		elif 'hg38' in key:
 			metadata=metadata[metadata['hg38_path'].notnull()]
 	else:
-		if db == 'CLDB_SR' and 'hg19' in key:
-			metadata = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t', index_col=False)
-		elif db == 'CLDB_SR' and 'hg38' in key:
-			metadata = pd.read_csv('/CLDB/meta/meta_SR_hg38.tsv', sep='\t', index_col=False)
-		elif db == 'GREGoR_SR':
-			metadata = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t', index_col=False)
 		if 'CNV' in key:
 			metadata=metadata[metadata['MD_path'].notnull()]
 		else:
@@ -112,6 +107,45 @@ def search_filters(db, key):
 			key = f'sv_id-{key}',
 			help='SV/CNV ID generated by caller')
 
+		region_mode = st.radio(
+			'Region match:',
+			['Contained', 'Overlap', 'Breakpoint'],
+			horizontal=True,
+			help='Contained: calls inside the breakpoint region. Overlap: calls overlapping it, optionally by '
+				'reciprocal overlap or breakpoint distance. Breakpoint: calls with either breakpoint (including '
+				'BND partners) within a window of the left breakpoint, or of the region',
+			key=f'region-mode-{key}')
+		min_ro = None
+		bkpt_tol = None
+		bkpt_window = None
+		if region_mode == 'Overlap':
+			min_ro = st.slider(
+				'Minimum reciprocal overlap (%)',
+				min_value=0,
+				max_value=100,
+				value=50,
+				step=5,
+				help='share of both the region and the call covered by their overlap; 0 for any overlap',
+				key=f'min-ro-{key}') / 100
+			bkpt_tol = st.number_input(
+				'Breakpoint tolerance (bp):',
+				value=None,
+				min_value=0,
+				help='also require each breakpoint within this distance of the region edge',
+				key=f'bkpt-tol-{key}')
+		elif region_mode == 'Breakpoint':
+			bkpt_window = st.number_input(
+				'Breakpoint window (bp):',
+				value=2000,
+				min_value=0,
+				step=500,
+				help='needs a chromosome and left breakpoint',
+				key=f'bkpt-window-{key}')
+			if chrom1 is None or start is None:
+				# breakpoint_search needs both; without them the search falls back to Contained
+				st.warning('Breakpoint match needs a Chromosome and Left Breakpoint; '
+					'until both are set the region is matched as Contained')
+
 	with col3:
 		end = st.number_input(
 			'Right Breakpoint:', 
@@ -133,8 +167,11 @@ def search_filters(db, key):
 			hpo_list = st.text_input(
 				'HPO terms Search', '',
 				key=f'hpo_genes-{key}',
-				help='comma-separated HPO terms list (e.g. "HP:0003300, HP:0000200")'
+				help='comma-separated HPO terms list (e.g. "HP:0003300, HP:0000200"); descendant terms are included'
 				)
+			if hpo_list.strip():
+				n_genes = len(pheno2gene([x.strip() for x in hpo_list.split(',')]))
+				st.caption(f'{n_genes} genes annotated directly to these terms')
 		
 
 	with col4:
@@ -185,7 +222,7 @@ def search_filters(db, key):
 		else:
 			OMIM_sym = st.selectbox(
 				'OMIM Disease Genes:',
-				OMIM_syms,
+				gene_symbols(key_ref(key), 'OMIM'),
 				index=None,
 				help='OMIM disease causing genes from UCSC (pheno_key 3/4)',
 				key=f'OMIMsyms-{key}'
@@ -198,13 +235,24 @@ def search_filters(db, key):
 		else:
 			rs_sym = st.selectbox(
 				'RefSeq Genes:',
-				rs_syms,
+				gene_symbols(key_ref(key), 'RefSeq'),
 				index=None,
 				help='RefSeq genes from NCBI curated list',
 				key=f'rssym-{key}'
 				)
 
 
+	# the FTS5 keyword index lives in the SQLite file only (helper/text_index)
+	if 'CGR' in key or parquet_dir(db) is not None:
+		keyword=''
+	else:
+		keyword = st.text_input(
+			'Disease/Phenotype Keyword Search', '',
+			key=f'keyword-{key}',
+			help='words from OMIM disease names, DECIPHER/ISCA regions or sample phenotypes '
+				'(e.g. "epileptic encephalopathy"); end a word with * to match its prefix'
+			)
+
 	if 'CGR' not in key:
 		col6, col7 = st.columns(2)
 		with col6: 
@@ -334,6 +382,19 @@ def search_filters(db, key):
 				else: 
 					db_freq_nonproband = None	
 
+				# only offered when helper/cluster_association scored clusters_{table}
+				assoc_p_max = None
+				if cluster_assoc and st.checkbox('Filter proband enrichment p-value',
+					help='One-sided test per cluster that its carriers are enriched for probands',
+					key=f'assoc-p-{key}'):
+					assoc_p_max = st.number_input(
+						'Max p-value:',
+						min_value=0.0,
+						max_value=1.0,
+						value=0.05,
+						format='%.2e',
+						key=f'assoc-p-input-{key}')
+
 				if st.checkbox('Filter Unique Individual Count', 
 					help='Number of unique individuals in a cluster in the whole DB',
 					key=f'df-count-{key}'):
@@ -424,6 +485,7 @@ def search_filters(db, key):
 		db_freq=None
 		db_freq_proband=None
 		db_freq_nonproband=None
+		assoc_p_max=None
 		count=None
 		gnomAD_freq=None
 		TopMED_freq=None
@@ -433,15 +495,19 @@ def search_filters(db, key):
 		OMIM_max=None
 
 	num_rows = st.selectbox(
-	'Show Number of Rows:',
-	[100,500,1000,5000,'All'],
-	help='Use lower number of rows to test your query for faster query time',
+	'Rows per Page:',
+	[100,500,1000,5000],
+	help='Results are fetched one page at a time; use Next/Previous page to walk through all of them',
 	key=f'nrows-{key}')
 
 	qry_dict={
 		'chrom1': chrom1,
 		'start': start,
 		'end': end,
+		'region_mode': region_mode,
+		'min_ro': min_ro,
+		'bkpt_tol': bkpt_tol,
+		'bkpt_window': bkpt_window,
 		'svtype': svtype,
 		'sv_id': sv_id,
 		'sv_len_min': sv_len_min, 
@@ -452,6 +518,7 @@ def search_filters(db, key):
 		'db_freq': db_freq,
 		'db_freq_proband': db_freq_proband,
 		'db_freq_nonproband': db_freq_nonproband,
+		'assoc_p_max': assoc_p_max,
 		'gnomAD_freq': gnomAD_freq,
 		'TopMED_freq': TopMED_freq,
 		'project': project, 
@@ -463,9 +530,11 @@ def search_filters(db, key):
 		'rs_sym': rs_sym,
 		'rs_list': gene_list,
 		'hpo_list': hpo_list,
+		'keyword': keyword,
 		'family': family,
 		'pt_id': pt_id,
 		'num_rows': num_rows,
+		'after': None,
 		'cluster_id': cluster_id,
 		'genotype': genotype,
 		'disrupt_gene_left': disrupt_gene_left,
@@ -482,44 +551,276 @@ def search_filters(db, key):
 	return qry_dict
 
 
-def search_build(qry_dict, table):
+def federated_filters(key):
+	# filters every dataset understands; the rest stay off (see default_qry_dict)
+	col1, col2, col3, col4 = st.columns(4)
+	with col1:
+		chrom1 = st.selectbox(
+			'Chromosome',
+			chrom,
+			index=None,
+			placeholder='Select Chromosome',
+			key=f'chrom1-{key}')
+
+		svtype = st.multiselect(
+			'SV/CNV type:',
+			['DUP', 'DEL', 'INV', 'INS', 'BND', 'HOM_DEL', 'HET_DEL', 'TRP', 'UND', 'MUL_GAIN'],
+			key=f'svtype-{key}')
+
+	with col2:
+		start = st.number_input(
+			'Left Breakpoint:',
+			value=None,
+			min_value=0,
+			key=f'start-{key}')
+
+		gene_list = st.text_input(
+			'RefSeq Gene Search', '',
+			key=f'gene_list-{key}',
+			help='comma-separated gene symbol list (e.g. "MECP2, SHANK3")')
+
+	with col3:
+		end = st.number_input(
+			'Right Breakpoint:',
+			value=None,
+			min_value=0,
+			key=f'end-{key}')
+
+		hpo_list = st.text_input(
+			'HPO terms Search', '',
+			key=f'hpo_genes-{key}',
+			help='comma-separated HPO terms list (e.g. "HP:0003300, HP:0000200"); descendant terms are included')
+
+	with col4:
+		if st.checkbox('Filter pseudo-frequency',
+			help='Frequency of number of unique individuals in a cluster in each DB',
+			key=f'db-freq-{key}'):
+			db_freq = st.slider(
+				' ',
+				value=(0.0, 1.0),
+				max_value=1.0,
+				step=0.0001,
+				format='%f',
+				key=f'df-freq-slider-{key}')
+		else:
+			db_freq = None
+
+		if st.checkbox('Filter gnomAD Frequency',
+			help='gnomAD (hg19-v2, hg38-v4) population frequency (if matched)',
+			key=f'gnomad-freq-{key}'):
+			gnomAD_freq = st.slider(
+				'',
+				value=(0.0, 1.0),
+				max_value=1.0,
+				step=0.0001,
+				format='%f',
+				key=f'gnomad-freq-slider-{key}')
+		else:
+			gnomAD_freq = None
+
+	num_rows = st.selectbox(
+		'Rows per Dataset:',
+		[100,500,1000,5000],
+		key=f'nrows-{key}')
+
+	qry_dict = default_qry_dict(num_rows)
+	qry_dict.update({
+		'chrom1': chrom1,
+		'start': start,
+		'end': end,
+		'svtype': svtype,
+		'rs_list': gene_list,
+		'hpo_list': hpo_list,
+		'db_freq': db_freq,
+		'gnomAD_freq': gnomAD_freq})
+	return qry_dict
+
+
+def dosage_filter(qry_dict):
+	# shared by call and cluster queries; the columns exist on both tables
+	dosage_filters = [qry_dict['pHaplo_collins'], qry_dict['pTriplo_collins'], qry_dict['pHaplo_clingen'], qry_dict['pTriplo_clingen'], qry_dict['decipher'], qry_dict['ISCA'], qry_dict['imprinting']]
+	if True not in dosage_filters:
+		return ''
+	tmp_qry = []
+	if qry_dict['pHaplo_collins']:
+		tmp_qry.append('collins_HI != 0')
+	if qry_dict['pTriplo_collins']:
+		tmp_qry.append('collins_TS != 0')
+	if qry_dict['pHaplo_clingen']:
+		tmp_qry.append('ClinGen_HI != 0')
+	if qry_dict['pTriplo_clingen']:
+		tmp_qry.append('ClinGen_TS != 0')
+	if qry_dict['decipher']:
+		tmp_qry.append('DECIPHER != 0')
+	if qry_dict['ISCA']:
+		tmp_qry.append('ISCA != 0')
+	if qry_dict['imprinting']:
+		tmp_qry.append('imprinting_genes != 0')
+	return f' AND ({" OR ".join(tmp_qry)})'
+
+
+def default_qry_dict(num_rows=100):
+	# qry_dict with every filter switched off, for building queries outside the filter widgets
+	return {
+		'chrom1': None, 'start': None, 'end': None, 'region_mode': 'Contained', 'min_ro': None, 'bkpt_tol': None,
+		'bkpt_window': None, 'meta_join': True,
+		'svtype': [], 'sv_id': None,
+		'sv_len_min': None, 'sv_len_max': None, 'SD_ol': None, 'is_proband': None,
+		'count': None, 'db_freq': None, 'db_freq_proband': None, 'db_freq_nonproband': None, 'assoc_p_max': None,
+		'gnomAD_freq': None, 'TopMED_freq': None, 'project': [],
+		'OMIM_min': None, 'OMIM_max': None, 'RefSeq_min': None, 'RefSeq_max': None,
+		'OMIM_sym': None, 'rs_sym': None, 'rs_list': '', 'hpo_list': '', 'keyword': '',
+		'family': [], 'pt_id': [], 'num_rows': num_rows, 'after': None, 'cluster_id': None, 'genotype': None,
+		'disrupt_gene_left': None, 'disrupt_gene_right': None,
+		'disrupt_repeat_left': None, 'disrupt_repeat_right': None,
+		'pHaplo_collins': None, 'pTriplo_collins': None, 'pHaplo_clingen': None, 'pTriplo_clingen': None,
+		'decipher': None, 'ISCA': None, 'imprinting': None}
+
+
+def list_table(name, values, params):
+	# list values are loaded into a per-connection temp table tmp_{name} (query.backend.bind_list_params),
+	# so the SQL text is the same whatever the list length
+	params[name] = list(values)
+	return f'tmp_{name}'
+
+
+def list_filter(name, values, params):
+	return f'(SELECT value FROM {list_table(name, values, params)})'
+
+
+def bin_filter(start, end, params):
+	# one BETWEEN per bin level; SQLite answers the OR with a multi-index probe on (chrom1, bin)
+	clauses = []
+	for i, (lo, hi) in enumerate(overlapping_bin_ranges(int(start), int(end) + 1)):
+		params[f'bin_lo_{i}'] = lo
+		params[f'bin_hi_{i}'] = hi
+		clauses.append(f'p.bin BETWEEN :bin_lo_{i} AND :bin_hi_{i}')
+	return f"({' OR '.join(clauses)})"
+
+
+def region_filter(qry_dict, alias, params):
+	"""Region clauses on {alias}.pos1/pos2: calls inside [start, end], or overlapping it.
+
+	Overlap mode takes an optional minimum reciprocal overlap (min_ro, a fraction) and
+	breakpoint tolerance (bkpt_tol, bp). Both bound pos1 to a range, so the
+	(chrom1, pos1) index or the bins narrow the search before the exact overlap test.
+	"""
+	start, end = qry_dict['start'], qry_dict['end']
+	if qry_dict['region_mode'] != 'Overlap':
+		clauses = []
+		if start is not None:
+			clauses.append(f'{alias}.pos1 >= :start')
+			params['start'] = start
+		if end is not None:
+			clauses.append(f'{alias}.pos2 <= :end')
+			params['end'] = end
+		return ''.join(f' AND {c}' for c in clauses)
+
+	# only calls with both breakpoints on one chromosome span an interval
+	clauses = [f'{alias}.chrom2 = {alias}.chrom1'] if start is not None or end is not None else []
+	if start is not None:
+		clauses.append(f'{alias}.pos2 >= :start')
+		params['start'] = start
+	if end is not None:
+		clauses.append(f'{alias}.pos1 <= :end')
+		params['end'] = end
+	if start is not None and end is not None and start <= end:
+		length = end - start + 1
+		if qry_dict['bkpt_tol'] is not None:
+			clauses.append(f'{alias}.pos1 BETWEEN :start - :bkpt_tol AND :start + :bkpt_tol')
+			clauses.append(f'{alias}.pos2 BETWEEN :end - :bkpt_tol AND :end + :bkpt_tol')
+			params['bkpt_tol'] = int(qry_dict['bkpt_tol'])
+		min_ro = qry_dict['min_ro']
+		if min_ro:
+			# a call overlapping at least min_ro of both lengths is no shorter than min_ro * length
+			# and no longer than length / min_ro, which bounds where it can start
+			params['pos1_lo'] = math.floor(start + min_ro * length - length / min_ro)
+			params['pos1_hi'] = math.ceil(end - min_ro * length + 1)
+			params['min_ro'] = float(min_ro)
+			overlap = (f'(CASE WHEN {alias}.pos2 < :end THEN {alias}.pos2 ELSE :end END)'
+				f' - (CASE WHEN {alias}.pos1 > :start THEN {alias}.pos1 ELSE :start END) + 1')
+			clauses.append(f'{alias}.pos1 BETWEEN :pos1_lo AND :pos1_hi')
+			clauses.append(f'{overlap} >= :min_ro * (:end - :start + 1)')
+			clauses.append(f'{overlap} >= :min_ro * ({alias}.pos2 - {alias}.pos1 + 1)')
+	return ''.join(f' AND {c}' for c in clauses)
+
+
+def breakpoint_search(qry_dict):
+	return qry_dict['region_mode'] == 'Breakpoint' and qry_dict['chrom1'] is not None and qry_dict['start'] is not None
+
+
+def breakpoint_filter(qry_dict, table, key_col, alias, params):
+	# either breakpoint within the window around [start, end]: one range scan on the
+	# (chrom1, pos1, key) index and one on (chrom2, pos2, key), so BND partners on chrom2 match too
+	end = qry_dict['end'] if qry_dict['end'] is not None else qry_dict['start']
+	window = int(qry_dict['bkpt_window'] or 0)
+	params['bkpt_chrom'] = str(qry_dict['chrom1'])
+	params['bkpt_lo'] = qry_dict['start'] - window
+	params['bkpt_hi'] = end + window
+	return (
+		f' AND {alias}.{key_col} IN (SELECT {key_col} FROM {table}'
+		' WHERE chrom1 = :bkpt_chrom AND pos1 BETWEEN :bkpt_lo AND :bkpt_hi'
+		f' UNION SELECT {key_col} FROM {table}'
+		' WHERE chrom2 = :bkpt_chrom AND pos2 BETWEEN :bkpt_lo AND :bkpt_hi)'
+	)
+
+
+def fts_match(keyword):
+	# every word quoted, so punctuation (Smith-Magenis, 22q11.2) is not read as FTS5 syntax;
+	# the words are ANDed and a trailing * keeps its prefix match
+	terms = []
+	for word in keyword.split():
+		prefix = word.endswith('*')
+		word = word.rstrip('*').replace('"', '""')
+		if word:
+			terms.append(f'"{word}"*' if prefix else f'"{word}"')
+	return ' '.join(terms)
+
+
+def keyword_filter(table):
+	# matching documents of {table}_fts (helper/text_index) reach calls through the gene and
+	# region child tables, or through PT_ID for sample phenotypes
+	return (
+		f"(p.UUID IN (SELECT g.UUID FROM {table}_fts f CROSS JOIN {table}_genes g"
+		f" WHERE f.{table}_fts MATCH :keyword AND f.source = 'OMIM' AND g.gene_symbol = f.key AND g.source = 'OMIM'"
+		f" UNION ALL SELECT r.UUID FROM {table}_fts f CROSS JOIN {table}_regions r"
+		f" WHERE f.{table}_fts MATCH :keyword AND r.region_name = f.key AND r.source = f.source)"
+		f" OR p.PT_ID IN (SELECT key FROM {table}_fts WHERE {table}_fts MATCH :keyword AND source = 'phenotype'))"
+	)
+
+
+def search_where(qry_dict, table):
 	# Initialize query
 	# st.write(qry_dict)
 	ref=table.split('_')[-1]
-	qry = f'SELECT p.*, m.sex, m.phenotype FROM {table} p JOIN meta_{ref} m ON p.pt_id = m.pt_id WHERE 1=1'
+	if qry_dict.get('meta_join', True):
+		qry = f'SELECT p.*, m.sex, m.phenotype FROM {table} p JOIN meta_{ref} m ON p.pt_id = m.pt_id WHERE 1=1'
+	else:
+		# sex/phenotype were denormalized into the call table by helper/to_sqlite (query.query.meta_joined)
+		qry = f'SELECT p.* FROM {table} p WHERE 1=1'
 
 	# Named parameters dictionary
 	params = {}
 
-	# Check if hpo_list is not empty, and fetch gene list
-	if len(qry_dict['hpo_list']) != 0:
-		tmp = []
-		for hpo in [x.strip() for x in qry_dict['hpo_list'].split(',')]:
-			tmp.append(pheno2gene(hpo))
-		out = list(set([x for xs in tmp for x in xs]))
-		qry_dict['rs_list'] = ','.join(out)
-
 	# Apply filters and add to query and parameters
-	if qry_dict['chrom1'] is not None:
-		qry += ' AND chrom1 = :chrom1'
-		params['chrom1'] = qry_dict['chrom1']
-
-	if qry_dict['start'] is not None:
-		qry += ' AND pos1 >= :start'
-		params['start'] = qry_dict['start']
-
-	if qry_dict['end'] is not None:
-		qry += ' AND pos2 <= :end'
-		params['end'] = qry_dict['end']
+	if breakpoint_search(qry_dict):
+		# the chromosome is the breakpoint's, which is chrom2 for BND partners
+		qry += breakpoint_filter(qry_dict, table, 'UUID', 'p', params)
+	else:
+		if qry_dict['chrom1'] is not None:
+			qry += ' AND chrom1 = :chrom1'
+			params['chrom1'] = str(qry_dict['chrom1'])
+		qry += region_filter(qry_dict, 'p', params)
+
+	# Narrow a full region to the (chrom1, bin) index ranges that can hold it; a call overlapping
+	# the region always sits in one of them. Only Overlap mode, which keeps calls with chrom2 = chrom1:
+	# a BND is binned on pos1 alone, and Contained keeps BNDs whose pos1 lies past the region end
+	if qry_dict['region_mode'] == 'Overlap' and qry_dict['chrom1'] is not None and qry_dict['start'] is not None \
+			and qry_dict['end'] is not None and qry_dict['start'] <= qry_dict['end']:
+		qry += f" AND {bin_filter(qry_dict['start'], qry_dict['end'], params)}"
 
 	if len(qry_dict['svtype']) != 0:
-		svtype_list = qry_dict['svtype']
-		placeholders = []
-		for i, sv in enumerate(svtype_list):
-			key = f"svtype_{i}"
-			placeholders.append(f":{key}")
-			params[key] = sv
-		qry += f" AND SV_TYPE IN ({', '.join(placeholders)})"
+		qry += f" AND SV_TYPE IN {list_filter('svtype', qry_dict['svtype'], params)}"
 
 
 	if qry_dict['sv_len_min'] is not None:
@@ -571,6 +872,10 @@ def search_build(qry_dict, table):
 		qry += ' AND nonproband_only_propensity BETWEEN :nonpro_pf1 AND :nonpro_pf2'
 		params['nonpro_pf1'] = pf1
 		params['nonpro_pf2'] = pf2
+
+	if qry_dict['assoc_p_max'] is not None:
+		qry += f' AND p.CLUSTER_ID IN (SELECT CLUSTER_ID FROM clusters_{table} WHERE assoc_pvalue <= :assoc_p_max)'
+		params['assoc_p_max'] = qry_dict['assoc_p_max']
 	
 	if qry_dict['gnomAD_freq'] is not None:
 		gf1 = qry_dict['gnomAD_freq'][0]
@@ -587,13 +892,7 @@ def search_build(qry_dict, table):
 		params['tm2'] = tm2
 
 	if len(qry_dict['project']) != 0:
-		project_list = qry_dict['project']
-		placeholders = []
-		for i, proj in enumerate(project_list):
-			key = f"project_{i}"
-			placeholders.append(f":{key}")
-			params[key] = proj
-		qry += f" AND PROJECT IN ({', '.join(placeholders)})"
+		qry += f" AND PROJECT IN {list_filter('project', qry_dict['project'], params)}"
 
 
 	if qry_dict['OMIM_min'] is not None:
@@ -612,83 +911,49 @@ def search_build(qry_dict, table):
 		qry += ' AND RefSeq_Count <= :RefSeq_max'
 		params['RefSeq_max'] = qry_dict['RefSeq_max']
 
+	# Gene filters are semi-joins on the {table}_genes child table built by helper/to_sqlite
 	if qry_dict['OMIM_sym'] is not None:
-	    gene = qry_dict['OMIM_sym'].strip().upper()
-	    qry += ' AND ('
-	    qry += (
-	        'OMIM_symbol = :OMIM_sym_exact '
-	        'OR OMIM_symbol LIKE :OMIM_sym_prefix '
-	        'OR OMIM_symbol LIKE :OMIM_sym_suffix '
-	        'OR OMIM_symbol LIKE :OMIM_sym_infix'
-	    )
-	    qry += ')'
-	    params['OMIM_sym_exact'] = gene
-	    params['OMIM_sym_prefix'] = f"{gene};%"
-	    params['OMIM_sym_suffix'] = f"%;{gene}"
-	    params['OMIM_sym_infix'] = f"%;{gene};%"
+		qry += f" AND p.UUID IN (SELECT UUID FROM {table}_genes WHERE source = 'OMIM' AND gene_symbol = :OMIM_sym)"
+		params['OMIM_sym'] = qry_dict['OMIM_sym'].strip().upper()
 
 	if qry_dict['rs_sym'] is not None:
-		gene = qry_dict['rs_sym'].strip().upper()
-		qry += ' AND ('
-		qry += (
-			'RefSeq_symbol = :rs_sym_exact '
-			'OR RefSeq_symbol LIKE :rs_sym_prefix '
-			'OR RefSeq_symbol LIKE :rs_sym_suffix '
-			'OR RefSeq_symbol LIKE :rs_sym_infix'
-		)
-		qry += ')'
-		params['rs_sym_exact'] = gene
-		params['rs_sym_prefix'] = f"{gene};%"
-		params['rs_sym_suffix'] = f"%;{gene}"
-		params['rs_sym_infix'] = f"%;{gene};%"
+		qry += f" AND p.UUID IN (SELECT UUID FROM {table}_genes WHERE source = 'RefSeq' AND gene_symbol = :rs_sym)"
+		params['rs_sym'] = qry_dict['rs_sym'].strip().upper()
 
 	if len(qry_dict['rs_list']) != 0:
 		genes = [x.strip().upper() for x in qry_dict['rs_list'].split(',')]
-		genes_2 = [genes[i:i + 300] for i in range(0, len(genes), 300)]  # smaller chunks due to OR expansion
-
-		qry += ' AND ('
-		param_counter = 0  # ensures unique parameter names
-
-		for group in genes_2:
-			qry += '('
-			for i, gene in enumerate(group):
-				if i > 0:
-					qry += ' OR '
-				qry += (
-					f"RefSeq_symbol = :gene_exact_{param_counter} "
-					f"OR RefSeq_symbol LIKE :gene_prefix_{param_counter} "
-					f"OR RefSeq_symbol LIKE :gene_suffix_{param_counter} "
-					f"OR RefSeq_symbol LIKE :gene_infix_{param_counter}"
-				)
-				params[f'gene_exact_{param_counter}'] = gene
-				params[f'gene_prefix_{param_counter}'] = f"{gene};%"
-				params[f'gene_suffix_{param_counter}'] = f"%;{gene}"
-				params[f'gene_infix_{param_counter}'] = f"%;{gene};%"
-				param_counter += 1
-			qry += ') OR '
+		genes = list(dict.fromkeys(x for x in genes if x))
+		if genes:
+			# CROSS JOIN keeps the small list table first, probing the gene index once per symbol
+			qry += (
+				f" AND p.UUID IN (SELECT g.UUID FROM {list_table('gene', genes, params)} t"
+				f" CROSS JOIN {table}_genes g WHERE g.gene_symbol = t.value AND g.source = 'RefSeq')"
+			)
+
+	# HPO terms match genes annotated to the term or any descendant (hpo_closure from helper/to_sqlite)
+	if len(qry_dict['hpo_list']) != 0:
+		hpo_ids = list(dict.fromkeys(x.strip() for x in qry_dict['hpo_list'].split(',') if x.strip()))
+		if hpo_ids:
+			qry += (
+				f" AND p.UUID IN (SELECT g.UUID FROM {list_table('hpo', hpo_ids, params)} t"
+				f" CROSS JOIN hpo_closure c CROSS JOIN hpo_genes h CROSS JOIN {table}_genes g"
+				f" WHERE c.ancestor = t.value AND h.hpo_id = c.descendant"
+				f" AND g.gene_symbol = h.gene_symbol AND g.source = 'RefSeq')"
+			)
 
-		qry += 'RefSeq_symbol = :empty_str)'
-		params['empty_str'] = ""
+	if qry_dict['keyword'].strip():
+		match = fts_match(qry_dict['keyword'])
+		if match:
+			qry += f' AND {keyword_filter(table)}'
+			params['keyword'] = match
 
 	# Family filter
 	if len(qry_dict['family']) != 0:
-		family_list = qry_dict['family']
-		placeholders = []
-		for i, fam in enumerate(family_list):
-			key = f"family_{i}"
-			placeholders.append(f":{key}")
-			params[key] = fam
-		qry += f" AND FAM_ID IN ({', '.join(placeholders)})"
+		qry += f" AND FAM_ID IN {list_filter('family', qry_dict['family'], params)}"
 
 	# Patient ID filter
 	if len(qry_dict['pt_id']) != 0:
-		pt_id_list = qry_dict['pt_id']
-		placeholders = []
-		for i, pid in enumerate(pt_id_list):
-			key = f"pt_id_{i}"
-			placeholders.append(f":{key}")
-			params[key] = pid
-		qry += f" AND p.PT_ID IN ({', '.join(placeholders)})"
+		qry += f" AND p.PT_ID IN {list_filter('pt_id', qry_dict['pt_id'], params)}"
 
 	if qry_dict['cluster_id'] is not None:
 		qry += ' AND CLUSTER_ID = :cluster_id'
@@ -723,49 +988,154 @@ def search_build(qry_dict, table):
 			tmp_qry.append('R_repeatmask != 0')
 		qry += f' AND ({" OR ".join(tmp_qry)})'
 
-	dosage_filters = [qry_dict['pHaplo_collins'], qry_dict['pTriplo_collins'], qry_dict['pHaplo_clingen'], qry_dict['pTriplo_clingen'], qry_dict['decipher'], qry_dict['ISCA'], qry_dict['imprinting']]
-	if True in dosage_filters:
-		tmp_qry = []
-		if qry_dict['pHaplo_collins']:
-			tmp_qry.append('collins_HI != 0')
-		if qry_dict['pTriplo_collins']:
-			tmp_qry.append('collins_TS != 0')
-		if qry_dict['pHaplo_clingen']:
-			tmp_qry.append('ClinGen_HI != 0')
-		if qry_dict['pTriplo_clingen']:
-			tmp_qry.append('ClinGen_TS != 0')
-		if qry_dict['decipher']:
-			tmp_qry.append('DECIPHER != 0')
-		if qry_dict['ISCA']:
-			tmp_qry.append('ISCA != 0')
-		if qry_dict['imprinting']:
-			tmp_qry.append('imprinting_genes != 0')
-		qry += f' AND ({" OR ".join(tmp_qry)})'
+	qry += dosage_filter(qry_dict)
+
+	return qry, params
+
+
+# Keysets used to page through results; backed by the (chrom1, pos1, UUID/CLUSTER_ID) indexes
+PAGE_KEY = ['chrom1', 'pos1', 'UUID']
+CLUSTER_PAGE_KEY = ['chrom1', 'pos1', 'CLUSTER_ID']
+# highest helper/priority_score first, backed by the (priority_score, UUID) index
+SCORE_PAGE_KEY = ['priority_score', 'UUID']
+
+
+def order_by(alias, page_key, descending=False):
+	direction = ' DESC' if descending else ''
+	return ', '.join(f'{alias}.{col}{direction}' for col in page_key)
+
+
+def page_after(df, page_key):
+	# keyset of the last row as Python scalars: sqlite3 binds numpy.int64 as a BLOB, which
+	# sorts after every number and string and ends the walk early
+	return tuple(v.item() if isinstance(v, np.generic) else v for v in df.iloc[-1][page_key])
+
+
+def paginate(qry, params, qry_dict, alias, page_key, descending=False):
+	cols = ', '.join(f'{alias}.{col}' for col in page_key)
+	# Keyset pagination: start right after the last row of the previous page
+	if qry_dict['after'] is not None:
+		qry += f" AND ({cols}) {'<' if descending else '>'} ({', '.join(f':after_{col}' for col in page_key)})"
+		for col, value in zip(page_key, qry_dict['after']):
+			params[f'after_{col}'] = value
+
+	qry += f' ORDER BY {order_by(alias, page_key, descending)} LIMIT :num_rows'
+	params['num_rows'] = qry_dict['num_rows']
+	return qry, params
+
+
+def search_build(qry_dict, table):
+	qry, params = search_where(qry_dict, table)
+	return paginate(qry, params, qry_dict, 'p', PAGE_KEY)
+
+
+def count_build(qry_dict, table):
+	qry, params = search_where(qry_dict, table)
+	return f'SELECT COUNT(*) AS n FROM ({qry})', params
+
+
+def export_build(qry_dict, table):
+	# every page in one ordered query, for the streaming export
+	qry, params = search_where(qry_dict, table)
+	return qry + f" ORDER BY {order_by('p', PAGE_KEY)}", params
+
+
+def score_build(qry_dict, table):
+	# the num_rows best-scored calls: ORDER BY priority_score DESC LIMIT k
+	qry, params = search_where(qry_dict, table)
+	return paginate(qry, params, qry_dict, 'p', SCORE_PAGE_KEY, descending=True)
 
-	if qry_dict['num_rows'] == 'All':
-		num_rows = 184467440737095516
+
+def score_export_build(qry_dict, table):
+	qry, params = search_where(qry_dict, table)
+	return qry + f" ORDER BY {order_by('p', SCORE_PAGE_KEY, descending=True)}", params
+
+
+def cluster_where(qry_dict, table):
+	# Cluster-level filters on clusters_{table} (built by helper/to_sqlite); per-call filters
+	# (samples, genotype, genes, breakpoints) apply once a cluster is opened in Calls mode
+	qry = f'SELECT c.* FROM clusters_{table} c WHERE 1=1'
+	params = {}
+
+	if breakpoint_search(qry_dict):
+		qry += breakpoint_filter(qry_dict, f'clusters_{table}', 'CLUSTER_ID', 'c', params)
 	else:
-		num_rows = qry_dict['num_rows']
-	qry += f' LIMIT :num_rows'
-	params['num_rows'] = num_rows
+		if qry_dict['chrom1'] is not None:
+			qry += ' AND c.chrom1 = :chrom1'
+			params['chrom1'] = str(qry_dict['chrom1'])
+		qry += region_filter(qry_dict, 'c', params)
+
+	if len(qry_dict['svtype']) != 0:
+		qry += f" AND c.SV_TYPE IN {list_filter('svtype', qry_dict['svtype'], params)}"
+
+	if qry_dict['sv_len_min'] is not None:
+		qry += ' AND c.SV_LEN >= :sv_len_min'
+		params['sv_len_min'] = qry_dict['sv_len_min']
+
+	if qry_dict['sv_len_max'] is not None:
+		qry += ' AND c.SV_LEN <= :sv_len_max'
+		params['sv_len_max'] = qry_dict['sv_len_max']
+
+	if qry_dict['SD_ol'] is not None:
+		qry += ' AND c.SD_overlap = :SD_ol'
+		params['SD_ol'] = 1 if qry_dict['SD_ol'] == 'True' else 0
+
+	ranges = {
+		'count': 'UNIQUE_PT_COUNT',
+		'db_freq': 'PSEUDO_FREQ',
+		'db_freq_proband': 'proband_only_propensity',
+		'db_freq_nonproband': 'nonproband_only_propensity',
+		'gnomAD_freq': 'gnomAD_AF',
+		'TopMED_freq': 'TopMED_AF',
+	}
+	for name, col in ranges.items():
+		if qry_dict[name] is not None:
+			qry += f' AND c.{col} BETWEEN :{name}_lo AND :{name}_hi'
+			params[f'{name}_lo'] = qry_dict[name][0]
+			params[f'{name}_hi'] = qry_dict[name][1]
+
+	if qry_dict['assoc_p_max'] is not None:
+		qry += ' AND c.assoc_pvalue <= :assoc_p_max'
+		params['assoc_p_max'] = qry_dict['assoc_p_max']
+
+	if qry_dict['OMIM_min'] is not None:
+		qry += ' AND c.OMIM_count BETWEEN :OMIM_min AND :OMIM_max'
+		params['OMIM_min'] = qry_dict['OMIM_min']
+		params['OMIM_max'] = qry_dict['OMIM_max']
+
+	if qry_dict['RefSeq_min'] is not None:
+		qry += ' AND c.RefSeq_count BETWEEN :RefSeq_min AND :RefSeq_max'
+		params['RefSeq_min'] = qry_dict['RefSeq_min']
+		params['RefSeq_max'] = qry_dict['RefSeq_max']
+
+	qry += dosage_filter(qry_dict)
 
 	return qry, params
 
 
+def cluster_build(qry_dict, table):
+	qry, params = cluster_where(qry_dict, table)
+	return paginate(qry, params, qry_dict, 'c', CLUSTER_PAGE_KEY)
+
+
+def cluster_count_build(qry_dict, table):
+	qry, params = cluster_where(qry_dict, table)
+	return f'SELECT COUNT(*) AS n FROM ({qry})', params
+
+
+def cluster_export_build(qry_dict, table):
+	qry, params = cluster_where(qry_dict, table)
+	return qry + f" ORDER BY {order_by('c', CLUSTER_PAGE_KEY)}", params
+
+
 def igv_filters(db, key):
+	metadata = sample_metadata(db, key_ref(key))
 	if db == 'CLDB_LR':
-		metadata = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t', index_col=False)
 		if 'hg19' in key: 
 			metadata=metadata[metadata['hg19_path'].notnull()]
 		elif 'hg38' in key:
 			metadata=metadata[metadata['hg38_path'].notnull()]
 	else:
-		if db == 'CLDB_SR' and 'hg19' in key:
-			metadata = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t', index_col=False)
-		elif db == 'CLDB_SR' and 'hg38' in key:
-			metadata = pd.read_csv('/CLDB/meta/meta_SR_hg38.tsv', sep='\t', index_col=False)
-		elif db == 'GREGoR_SR':
-			metadata = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t', index_col=False)
 		metadata=metadata[metadata['BAM_path'].notnull()]
 
 	pt_ids = metadata.pt_id.unique()
@@ -781,19 +1151,13 @@ def igv_filters(db, key):
 
 
 def vizCNV_filters(db, key):
+	metadata = sample_metadata(db, key_ref(key))
 	if db == 'CLDB_LR':
-		metadata = pd.read_csv('/CLDB/meta/meta_LR.tsv', sep='\t', index_col=False)
 		if 'hg19' in key: 
 			metadata=metadata[metadata['hg19_path'].notnull()]
 		elif 'hg38' in key:
 			metadata=metadata[metadata['hg38_path'].notnull()]
 	else:
-		if db == 'CLDB_SR' and 'hg19' in key:
-			metadata = pd.read_csv('/CLDB/meta/meta_SR_hg19.tsv', sep='\t', index_col=False)
-		elif db == 'CLDB_SR' and 'hg38' in key:
-			metadata = pd.read_csv('/CLDB/meta/meta_SR_hg38.tsv', sep='\t', index_col=False)
-		elif db == 'GREGoR_SR':
-			metadata = pd.read_csv('/CLDB/meta/gregor_meta.tsv', sep='\t', index_col=False)
 		metadata=metadata[metadata['BAM_path'].notnull()]
 
 	pt_ids = metadata.pt_id.unique()
@@ -0,0 +1,107 @@
+"""
+Query telemetry: one row per executed query in a local SQLite file, summarized on the
+Telemetry page. Off unless switched on with a path in .streamlit/secrets.toml:
+
+	[telemetry]
+	enabled = true
+	path = "/CLDB/telemetry.sqlite"
+	explain = false     # also record EXPLAIN QUERY PLAN, one extra statement per uncached query
+
+A query's shape is its normalized SQL with any numbered placeholders folded together;
+list filters are temp tables (query.backend.bind_list_params), so their SQL never varies.
+"""
+import re
+import json
+import time
+import sqlite3 as sq
+import threading
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+from query.cache import normalize_sql
+
+DEFAULTS = {'enabled': False, 'path': None, 'explain': False}
+LIST_PLACEHOLDERS = re.compile(r'\(:(\w+?)_\d+(?:, :\1_\d+)*\)')
+SCHEMA = """CREATE TABLE IF NOT EXISTS query_log (
+	ts REAL, db TEXT, label TEXT, shape TEXT, sql TEXT, params TEXT, plan TEXT,
+	seconds REAL, rows INTEGER, mem_bytes INTEGER, cached INTEGER)"""
+
+_lock = threading.Lock()
+
+
+def telemetry_settings():
+	settings = dict(DEFAULTS)
+	settings.update(st.secrets.get('telemetry', {}))
+	# no path, no log: never fall back to a file in the working directory
+	settings['enabled'] = bool(settings['enabled'] and settings['path'])
+	settings['explain'] = bool(settings['enabled'] and settings['explain'])
+	return settings
+
+
+def query_shape(qry):
+	return LIST_PLACEHOLDERS.sub(r'(:\1_*)', normalize_sql(qry))
+
+
+def param_shape(params):
+	# types and list lengths only; values can identify samples
+	shape = {}
+	for name, value in params.items():
+		kind = f'list[{len(value)}]' if isinstance(value, (list, tuple)) else type(value).__name__
+		shape.setdefault(re.sub(r'_\d+$', '_*', name), []).append(kind)
+	return json.dumps({name: kinds[0] if len(kinds) == 1 else f'{kinds[0]} x{len(kinds)}'
+		for name, kinds in shape.items()}, sort_keys=True)
+
+
+def explain_plan(conn, qry, params):
+	"""EXPLAIN QUERY PLAN of qry on an open SQLAlchemy connection to a SQLite DB."""
+	return '\n'.join(row[3] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {qry}'), params))
+
+
+def record_query(db, label, qry, params, seconds, rows=None, mem_bytes=None, cached=False, plan=None):
+	settings = telemetry_settings()
+	if not settings['enabled']:
+		return
+	row = (time.time(), db, label, query_shape(qry), normalize_sql(qry), param_shape(params), plan,
+		seconds, rows, mem_bytes, int(cached))
+	# telemetry must never break a query
+	try:
+		with _lock:
+			conn = sq.connect(settings['path'], timeout=5)
+			try:
+				conn.execute(SCHEMA)
+				conn.execute('INSERT INTO query_log VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+				conn.commit()
+			finally:
+				conn.close()
+	except sq.Error:
+		pass
+
+
+def load_log(since=None):
+	settings = telemetry_settings()
+	conn = sq.connect(settings['path'], timeout=5)
+	try:
+		conn.execute(SCHEMA)
+		return pd.read_sql('SELECT * FROM query_log WHERE ts >= ?', conn, params=(since or 0,))
+	finally:
+		conn.close()
+
+
+def summarize_shapes(log):
+	"""Per (db, label, shape): executions, cache hits, latency percentiles, rows, memory and the last plan."""
+	executed = log[log['cached'] == 0]
+	if executed.empty:
+		return pd.DataFrame()
+	grouped = executed.sort_values('ts').groupby(['db', 'label', 'shape'])
+	summary = grouped.agg(
+		runs=('seconds', 'size'),
+		mean_s=('seconds', 'mean'),
+		p95_s=('seconds', lambda s: s.quantile(0.95)),
+		max_s=('seconds', 'max'),
+		mean_rows=('rows', 'mean'),
+		max_MB=('mem_bytes', lambda b: b.max() / 1024 ** 2),
+		plan=('plan', 'last'),
+	)
+	hits = log[log['cached'] == 1].groupby(['db', 'label', 'shape']).size().rename('cache_hits')
+	summary = summary.join(hits).fillna({'cache_hits': 0}).astype({'cache_hits': int}).reset_index()
+	return summary.round({'mean_s': 3, 'p95_s': 3, 'max_s': 3, 'mean_rows': 1, 'max_MB': 2})
@@ -0,0 +1,18 @@
+"""Exports left in the temp dir by sessions that ended are swept once they are EXPORT_MAX_AGE old."""
+import os
+import time
+import tempfile
+from query.export import EXPORT_MAX_AGE, EXPORT_PREFIX, sweep_exports
+
+
+def test_sweep_removes_only_stale_exports(tmp_path, monkeypatch):
+	monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+	stale, fresh, other = (tmp_path / name for name in [f'{EXPORT_PREFIX}a.tsv.gz', f'{EXPORT_PREFIX}b.parquet', 'other.tsv.gz'])
+	for path in (stale, fresh, other):
+		path.write_bytes(b'x')
+	old = time.time() - EXPORT_MAX_AGE - 60
+	os.utime(stale, (old, old))
+	os.utime(other, (old, old))
+
+	assert sweep_exports() == 1
+	assert not stale.exists() and fresh.exists() and other.exists()
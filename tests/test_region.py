@@ -0,0 +1,27 @@
+"""Region matching returns the same calls with the (chrom1, bin) narrowing as without it."""
+import sqlite3 as sq
+import pandas as pd
+from helper.to_sqlite import assign_bin
+from query.search_filters import count_build, default_qry_dict
+
+TABLE = 'P2_hg19'
+
+
+def region_count(conn, region_mode):
+	qry_dict = dict(default_qry_dict(), chrom1=1, start=1_000_000, end=2_000_000, region_mode=region_mode, meta_join=False)
+	qry, params = count_build(qry_dict, TABLE)
+	return conn.execute(qry, params).fetchone()[0]
+
+
+def test_bin_narrowing_keeps_region_semantics(tmp_path):
+	calls = assign_bin(pd.DataFrame({
+		'chrom1': ['1', '1', '1', '1'], 'pos1': [1_200_000, 1_500_000, 50_000_000, 500_000],
+		'chrom2': ['1', '1', '5', '1'], 'pos2': [1_800_000, 2_500_000, 100_000, 1_500_000],
+		'UUID': ['inside', 'overlap', 'bnd', 'left']}))
+	conn = sq.connect(tmp_path / 'region.sqlite')
+	calls.to_sql(TABLE, conn, index=False)
+	# Contained: pos1 >= start and pos2 <= end, so the BND with its partner on chr5 matches
+	assert region_count(conn, 'Contained') == 2
+	# Overlap: intervals on chrom1 only
+	assert region_count(conn, 'Overlap') == 3
+	conn.close()
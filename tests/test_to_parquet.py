@@ -0,0 +1,51 @@
+"""The Parquet export keeps one schema per table, so DuckDB reads every file of it together."""
+import sqlite3 as sq
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+from helper.to_parquet import write_parquet
+
+
+@pytest.fixture
+def db_path(tmp_path):
+	db_path = tmp_path / 'calls.sqlite'
+	autosomes = pd.DataFrame({
+		'chrom1': np.repeat([1, 2], 250), 'pos1': np.arange(500), 'chrom2': np.repeat([1, 2], 250),
+		'pos2': np.arange(500) + 10, 'SV_TYPE': 'DEL', 'UUID': [f'a{i}' for i in range(500)], 'gnomAD_AF': np.nan,
+		'CLUSTER_ID': np.repeat([1, 2], 250)})
+	# appended after the first chunk declared chrom1/chrom2 INTEGER
+	sex_chroms = autosomes.assign(chrom1='X', chrom2=['X', None] * 250, gnomAD_AF=0.1,
+		UUID=[f'x{i}' for i in range(500)], CLUSTER_ID=3)
+	conn = sq.connect(db_path)
+	autosomes.to_sql('P2_hg19', conn, index=False)
+	sex_chroms.to_sql('P2_hg19', conn, index=False, if_exists='append')
+	# no declared types, as CREATE TABLE AS leaves them
+	conn.execute('CREATE TABLE clusters_P2_hg19 AS SELECT CLUSTER_ID, MIN(chrom1) AS chrom1, '
+		'MIN(chrom2) AS chrom2, MAX(gnomAD_AF) AS gnomAD_AF FROM P2_hg19 GROUP BY CLUSTER_ID')
+	conn.commit()
+	conn.close()
+	return db_path
+
+
+def chrom2_counts(source):
+	return duckdb.sql(
+		f'SELECT chrom2, COUNT(*) AS n, COUNT(gnomAD_AF) AS af FROM {source} GROUP BY chrom2 ORDER BY chrom2').fetchall()
+
+
+# 300 splits the table across chunks; the default reads autosomes and X in one chunk
+@pytest.mark.parametrize('chunksize', [300, 1_000_000])
+def test_chrom_columns_are_text_in_every_file(db_path, tmp_path, chunksize):
+	out = tmp_path / 'parquet'
+	write_parquet(f'sqlite:///{db_path}', str(out), ['P2_hg19'], chunksize=chunksize)
+	source = (f"read_parquet('{out}/P2_hg19/**/*.parquet', hive_partitioning = true, "
+		"hive_types = {'chrom1': VARCHAR, 'SV_TYPE': VARCHAR})")
+	assert chrom2_counts(source) == [('1', 250, 0), ('2', 250, 0), ('X', 250, 250), (None, 250, 250)]
+
+
+def test_single_file_tables_with_mixed_chromosomes(db_path, tmp_path):
+	out = tmp_path / 'parquet'
+	write_parquet(f'sqlite:///{db_path}', str(out), [])
+	assert chrom2_counts(f"'{out}/P2_hg19.parquet'") == [('1', 250, 0), ('2', 250, 0), ('X', 250, 250), (None, 250, 250)]
+	clusters = duckdb.sql(f"SELECT CLUSTER_ID, chrom1, gnomAD_AF FROM '{out}/clusters_P2_hg19.parquet' ORDER BY 1").fetchall()
+	assert clusters == [(1, '1', None), (2, '2', None), (3, 'X', 0.1)]